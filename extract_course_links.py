@@ -1,376 +1,964 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from lxml import html
-import time
-import os
-from datetime import datetime
-
-# ------------------------------
-# Config
-# ------------------------------
-BASE_URL = "https://www.coursera.org/browse"  # your base url for Explore
-# Your Explore Categories container XPath
-EXPLORE_CONTAINER_XPATH = "/html/body/div[2]/div/div/div/div[3]/div[1]/div/div[1]"
-# Optional “Show more” within Explore, if it exists
-SHOW_MORE_XPATHS = [
-    ".//button[normalize-space()='Show more']",
-    ".//button[contains(., 'Show') and contains(., 'more')]",
-    ".//button[contains(@aria-label, 'Show') and contains(@aria-label, 'more')]",
-]
-# Your exact Next button XPath (button, not SVG)
-NEXT_BUTTON_XPATH_PRIMARY = "/html/body/div[2]/div/div/div/div[3]/div[1]/div/div[10]/div/section/div/div/div/div[3]/div/div/div[3]/div[2]/div/nav/ul/li[9]/button"
-# Robust fallbacks for Next button across UI variants
-NEXT_BUTTON_FALLBACKS = [
-    "//*[@aria-label='Next Page' and not(@disabled)]",
-    "//nav[contains(@class,'pagination')]//button[not(@disabled)][@aria-label='Next']",
-    "//nav[contains(@class,'pagination')]//li[contains(@class,'next')]//button[not(@disabled)]",
-    "//button[.//span[contains(.,'Next')]][not(@disabled)]",
-    "//button[contains(@class,'pagination')]//span[contains(.,'Next')]/ancestor::button[not(@disabled)]",
-]
-# Your original absolute XPath for course links
-ABS_LINK_XPATH = "/html/body/div[2]/div/div/div/div[3]/div[1]/div/div[10]/div/section/div/div/div/div[3]/div/div/div[2]/div[1]/div/ul/li/div/div/div/div/div/div[2]/div[1]/div[2]/a/@href"
-# Robust fallback that finds course detail links regardless of layout
-FALLBACK_LINK_XPATH = "//a[contains(@href, '/learn/')]/@href"
-# Output path (as requested)
-OUT_PATH = r"C:\Web Scrapping\xpaths.txt"  # same as your original
-# Safety cap on pages
-MAX_PAGES = 500
-PAGE_DELAY_SEC = 1.0
-
-# ------------------------------
-# Selenium setup
-# ------------------------------
-chrome_options = Options()
-# If Next button isn't found in headless mode, try commenting this line to run non-headless:
-chrome_options.add_argument("--headless=new")
-chrome_options.add_argument("--window-size=1920,1080")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-# Help headless reliability
-chrome_options.add_argument(
-    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-)
-chrome_options.add_argument("--disable-dev-shm-usage")
-
-service = Service(r"C:\Users\Admin\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe")
-driver = webdriver.Chrome(service=service, options=chrome_options)
-wait = WebDriverWait(driver, 20)
-
-# ------------------------------
-# Timing + streaming write helpers
-# ------------------------------
-def now_str():
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-def load_already_written(path):
-    """
-    Load existing links from xpaths.txt so we don't re-write duplicates.
-    If the file doesn't exist yet, return an empty set.
-    """
-    if not os.path.exists(path):
-        return set()
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            # only keep lines that look like URLs
-            return set(line.strip() for line in f if line.strip().startswith("http"))
-    except Exception:
-        return set()
-
-def append_run_header(path, start_ts):
-    """
-    Append a visible run header to help auditing:
-    ---- RUN START [timestamp] ----
-    """
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(f"\n---- RUN START [{start_ts}] ----\n")
-        f.flush()
-
-def append_run_footer(path, end_ts, total_new, total_unique, duration_sec):
-    """
-    Append the run footer:
-    ---- RUN END [timestamp] (new: X, unique: Y, duration: Zs) ----
-    """
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(
-            f"---- RUN END   [{end_ts}] (new_written={total_new}, unique_all={total_unique}, duration={duration_sec:.2f}s) ----\n"
-        )
-        f.flush()
-
-def append_links(path, links, already_written):
-    """
-    Write each new link immediately (append mode).
-    Returns how many NEW lines were written.
-    """
-    new_count = 0
-    with open(path, "a", encoding="utf-8") as f:
-        for link in sorted(links):
-            if link not in already_written:
-                f.write(link + "\n")
-                new_count += 1
-                # update the set so later pages/categories don't re-write
-                already_written.add(link)
-        f.flush()
-    return new_count
-
-# ------------------------------
-# Helpers (unchanged logic, minor edits for streaming)
-# ------------------------------
-def accept_cookies_if_present():
-    """
-    Dismiss common cookie banners so elements behind are interactable.
-    Coursera uses OneTrust frequently.
-    """
-    selectors = [
-        "//*[@id='onetrust-accept-btn-handler']",
-        "//button[normalize-space()='Accept']",
-        "//button[contains(., 'Accept all')]",
-        "//button[contains(@class,'ot-sdk-container')]//button[contains(@id,'accept')]",
-    ]
-    for xp in selectors:
-        try:
-            btns = driver.find_elements(By.XPATH, xp)
-            for b in btns:
-                if b.is_displayed():
-                    driver.execute_script("arguments[0].click();", b)
-                    time.sleep(0.5)
-                    return
-        except Exception:
-            continue
-
-def expand_show_more_if_present(container):
-    """Reveal hidden chips if 'Show more' exists."""
-    for xp in SHOW_MORE_XPATHS:
-        try:
-            btns = container.find_elements(By.XPATH, xp)
-            for b in btns:
-                if b.is_displayed():
-                    driver.execute_script("arguments[0].click();", b)
-                    time.sleep(0.5)
-                    return
-        except Exception:
-            continue
-
-def discover_categories_from_explore_container():
-    """
-    Use your Explore container XPath to find all /browse/* anchors.
-    Returns dict {visible_text: absolute_url}
-    """
-    try:
-        container = wait.until(EC.presence_of_element_located((By.XPATH, EXPLORE_CONTAINER_XPATH)))
-    except Exception:
-        return {}
-    expand_show_more_if_present(container)
-
-    anchors = container.find_elements(By.XPATH, ".//a[contains(@href, '/browse/')]")
-    categories = {}
-    for a in anchors:
-        try:
-            href = (a.get_attribute("href") or "").strip()
-            text = (a.text or "").strip()
-            if not href:
-                continue
-            if not href.startswith("http"):
-                href = "https://www.coursera.org" + href
-            if not text:
-                text = (
-                    a.get_attribute("aria-label")
-                    or a.get_attribute("data-click-value")
-                    or href.rsplit("/", 1)[-1]
-                )
-            categories[text] = href
-        except Exception:
-            continue
-    return categories
-
-def discover_categories_fallback_from_page_source():
-    """
-    If Explore container fails (e.g., headless rendering),
-    scan the whole page for /browse/<category> anchors.
-    """
-    tree = html.fromstring(driver.page_source)
-    hrefs = set(tree.xpath("//a[starts-with(@href, '/browse/')]/@href"))
-    categories = {}
-    for href in hrefs:
-        full = "https://www.coursera.org" + href if not href.startswith("http") else href
-        key = href.strip("/").split("/")[-1] or full
-        categories[key] = full
-    return categories
-
-def extract_links_from_page_source(page_source):
-    """
-    Parse the rendered HTML with lxml, try your absolute XPath first,
-    and fall back to a resilient relative XPath if needed.
-    """
-    tree = html.fromstring(page_source)
-    links = tree.xpath(ABS_LINK_XPATH)
-    if not links:
-        links = tree.xpath(FALLBACK_LINK_XPATH)
-
-    # Normalize to full URLs
-    full_links = set()
-    for href in links:
-        if not href:
-            continue
-        if href.startswith("http"):
-            full_links.add(href)
-        else:
-            full_links.add("https://www.coursera.org" + href)
-    return full_links
-
-def find_clickable_next():
-    """
-    Locate the Next button via your XPath and verify it's clickable (not disabled).
-    Try your primary first, then fallbacks.
-    """
-    try:
-        btn = wait.until(EC.presence_of_element_located((By.XPATH, NEXT_BUTTON_XPATH_PRIMARY)))
-        if (btn.get_attribute("disabled") is None) and (btn.get_attribute("aria-disabled") != "true"):
-            return btn
-    except Exception:
-        pass
-    for xp in NEXT_BUTTON_FALLBACKS:
-        try:
-            btn = wait.until(EC.presence_of_element_located((By.XPATH, xp)))
-            if (btn.get_attribute("disabled") is None) and (btn.get_attribute("aria-disabled") != "true"):
-                return btn
-        except Exception:
-            continue
-    return None
-
-def click_next(btn):
-    """Scroll to and click the Next button; try JS click for reliability."""
-    try:
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-        time.sleep(0.3)
-        driver.execute_script("arguments[0].click();", btn)
-        return True
-    except Exception:
-        try:
-            btn.click()
-            return True
-        except Exception:
-            return False
-
-def wait_for_course_grid():
-    """Ensure some anchors exist before scraping links."""
-    try:
-        wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a")))
-    except Exception:
-        time.sleep(1.0)
-
-def scrape_category(category_name, category_url, already_written, global_link_set):
-    """
-    Visit a category URL, paginate with Next, and collect all /learn/ links.
-    Streams links to disk on every page.
-    """
-    driver.get(category_url)
-    time.sleep(1.5)
-    accept_cookies_if_present()
-    wait_for_course_grid()
-    page_index = 1
-    total_new_written = 0
-
-    while page_index <= MAX_PAGES:
-        # Parse current page
-        page_source = driver.page_source
-        page_links = extract_links_from_page_source(page_source)
-
-        # Add to global set and append immediately to file
-        before_size = len(global_link_set)
-        global_link_set |= page_links
-        # write only new-to-file links to disk
-        new_written = append_links(OUT_PATH, page_links, already_written)
-        total_new_written += new_written
-
-        print(f"[{category_name}] Page {page_index}: +{len(page_links)} "
-              f"(page-new-written={new_written}, total {len(global_link_set)})")
-
-        # Keep a reference element to detect DOM staleness after clicking next
-        old_anchor = None
-        try:
-            anchors_now = driver.find_elements(By.XPATH, "//a[contains(@href, '/learn/')]")
-            if anchors_now:
-                old_anchor = anchors_now[0]
-        except Exception:
-            pass
-
-        # Find & click Next
-        next_btn = find_clickable_next()
-        if not next_btn:
-            print(f"[{category_name}] Next button not found or disabled. Stopping.")
-            break
-        clicked = click_next(next_btn)
-        if not clicked:
-            print(f"[{category_name}] Failed to click Next button. Stopping.")
-            break
-
-        # Wait for page to change (staleness) or fallback sleep
-        try:
-            if old_anchor is not None:
-                wait.until(EC.staleness_of(old_anchor))
-            else:
-                time.sleep(2.0)
-        except Exception:
-            time.sleep(2.0)
-
-        page_index += 1
-        time.sleep(PAGE_DELAY_SEC)  # polite delay
-
-    return total_new_written
-
-# ------------------------------
-# Main
-# ------------------------------
-all_links_global = set()
-already_written = load_already_written(OUT_PATH)
-
-start_ts = now_str()
-start_wall = time.time()
-append_run_header(OUT_PATH, start_ts)
-print(f"== RUN START [{start_ts}] ==")
-
-try:
-    # 1) Go to base browse page and enumerate categories from Explore
-    driver.get(BASE_URL)
-    time.sleep(2.0)
-    accept_cookies_if_present()
-    categories = discover_categories_from_explore_container()
-    if not categories:
-        # Fallback if Explore container couldn't be located in headless
-        categories = discover_categories_fallback_from_page_source()
-    print(f"Found {len(categories)} categories in Explore.")
-    for name, href in sorted(categories.items()):
-        print(f"- {name}: {href}")
-
-    if not categories:
-        print("WARNING: No categories discovered. Try running non-headless or verify the XPath on the base URL.")
-    else:
-        # 2) Scrape each discovered category
-        total_new_written_run = 0
-        for cat_name, cat_url in categories.items():
-            print(f"\n=== Scraping category: {cat_name} ===")
-            new_written_cat = scrape_category(cat_name, cat_url, already_written, all_links_global)
-            total_new_written_run += new_written_cat
-            print(f"=== {cat_name}: {len(all_links_global)} unique course links so far (new-written-this-cat={new_written_cat}) ===")
-
-finally:
-    driver.quit()
-
-# ------------------------------
-# End-of-run summary + footer
-# ------------------------------
-end_ts = now_str()
-duration_sec = time.time() - start_wall
-print(f"\nTotal unique course links across all categories: {len(all_links_global)}\n")
-for link in sorted(all_links_global):
-    print(link)
-
-append_run_footer(OUT_PATH, end_ts, total_new=len(already_written), total_unique=len(all_links_global), duration_sec=duration_sec)
-print(f"\n== RUN END   [{end_ts}] (unique_all={len(all_links_global)}, duration={duration_sec:.2f}s) ==")
-print(f"Streaming writes completed. File: {OUT_PATH}")
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from lxml import html, etree
+import requests
+import asyncio
+import gzip
+import io
+import re
+import time
+import os
+import json
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+try:
+    import httpx
+except ImportError:
+    httpx = None  # API path falls back to Selenium without it
+
+# ------------------------------
+# Config
+# ------------------------------
+BASE_URL = "https://www.coursera.org/browse"  # your base url for Explore
+# Your Explore Categories container XPath
+EXPLORE_CONTAINER_XPATH = "/html/body/div[2]/div/div/div/div[3]/div[1]/div/div[1]"
+# Optional “Show more” within Explore, if it exists
+SHOW_MORE_XPATHS = [
+    ".//button[normalize-space()='Show more']",
+    ".//button[contains(., 'Show') and contains(., 'more')]",
+    ".//button[contains(@aria-label, 'Show') and contains(@aria-label, 'more')]",
+]
+# Your exact Next button XPath (button, not SVG)
+NEXT_BUTTON_XPATH_PRIMARY = "/html/body/div[2]/div/div/div/div[3]/div[1]/div/div[10]/div/section/div/div/div/div[3]/div/div/div[3]/div[2]/div/nav/ul/li[9]/button"
+# Robust fallbacks for Next button across UI variants
+NEXT_BUTTON_FALLBACKS = [
+    "//*[@aria-label='Next Page' and not(@disabled)]",
+    "//nav[contains(@class,'pagination')]//button[not(@disabled)][@aria-label='Next']",
+    "//nav[contains(@class,'pagination')]//li[contains(@class,'next')]//button[not(@disabled)]",
+    "//button[.//span[contains(.,'Next')]][not(@disabled)]",
+    "//button[contains(@class,'pagination')]//span[contains(.,'Next')]/ancestor::button[not(@disabled)]",
+]
+# One union evaluated with a single short wait fails fast at the end of a
+# category; trying each candidate with its own 20 s wait took minutes to
+# conclude "no next button".
+NEXT_UNION = " | ".join([NEXT_BUTTON_XPATH_PRIMARY] + NEXT_BUTTON_FALLBACKS)
+SHOW_MORE_UNION = " | ".join(SHOW_MORE_XPATHS)
+# Your original absolute XPath for course links
+ABS_LINK_XPATH = "/html/body/div[2]/div/div/div/div[3]/div[1]/div/div[10]/div/section/div/div/div/div[3]/div/div/div[2]/div[1]/div/ul/li/div/div/div/div/div/div[2]/div[1]/div[2]/a/@href"
+# Robust fallback that finds course detail links regardless of layout
+FALLBACK_LINK_XPATH = "//a[contains(@href, '/learn/')]/@href"
+# Output path (as requested)
+OUT_PATH = r"C:\Web Scrapping\xpaths.txt"  # same as your original
+# Resolve and create the output directory once at startup instead of paying
+# the stat() inside makedirs(exist_ok=True) on every header write.
+OUT_DIR = os.path.dirname(OUT_PATH)
+os.makedirs(OUT_DIR, exist_ok=True)
+# Safety cap on pages
+MAX_PAGES = 500
+# Politeness delay between pages. Readiness is now detected via network
+# quiescence (wait_until_network_idle), so this no longer doubles as a
+# "hope the page loaded" sleep.
+PAGE_DELAY_SEC = 0.2
+# Headless Chrome instances used when categories are scraped in parallel
+# (Selenium fallback path). Categories are embarrassingly parallel; keep this
+# modest so Coursera doesn't rate-limit us.
+POOL_SIZE = 4
+
+# ------------------------------
+# Coursera search API (no browser)
+# ------------------------------
+# The browse grid is fed by a GraphQL search endpoint that returns links as JSON.
+# Hitting it directly skips Chrome launch, React rendering, and all the waits —
+# each "page" becomes one small JSON response. Selenium stays as a fallback.
+USE_API = True
+# Cheaper still than the search API: Coursera publishes sitemaps listing every
+# /learn/ URL. One XML walk replaces the whole category crawl, so this is
+# tried first; the API and Selenium rungs below remain as fallbacks.
+USE_SITEMAP = True
+SITEMAP_URL = "https://www.coursera.org/sitemap.xml"
+GRAPHQL_URL = "https://www.coursera.org/graphql-gateway?opname=Search"
+SEARCH_INDEX = "prod_all_launched_products_term_optimization"
+API_HITS_PER_PAGE = 100
+# How many API requests may be in flight at once, across all categories.
+API_CONCURRENCY = 8
+API_HEADERS = {
+    "content-type": "application/json",
+    "apollographql-client-name": "search-v2",
+    "user-agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "accept-language": "en-US,en;q=0.9",
+}
+# Captured from the XHR the browse page fires (DevTools → Network → graphql-gateway).
+SEARCH_QUERY = """
+query Search($requests: [Search_Request!]!) {
+  SearchResult {
+    search(requests: $requests) {
+      elements {
+        ... on Search_ProductHit {
+          objectUrl
+        }
+      }
+      pagination {
+        totalElements
+      }
+    }
+  }
+}
+""".strip()
+
+# ------------------------------
+# Selenium setup
+# ------------------------------
+chrome_options = Options()
+# If Next button isn't found in headless mode, try commenting this line to run non-headless:
+chrome_options.add_argument("--headless=new")
+chrome_options.add_argument("--window-size=1920,1080")
+chrome_options.add_argument("--disable-gpu")
+chrome_options.add_argument("--no-sandbox")
+chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+# Help headless reliability
+chrome_options.add_argument(
+    "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+)
+chrome_options.add_argument("--disable-dev-shm-usage")
+# Blink-level switches: skip image decode/layout entirely, stop throttling and
+# background subsystems the scrape never uses, and keep the disk cache out of
+# the picture for a single-pass crawl.
+chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+chrome_options.add_argument("--disable-background-timer-throttling")
+chrome_options.add_argument("--disable-renderer-backgrounding")
+chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+chrome_options.add_argument("--disable-features=TranslateUI,MediaRouter,OptimizationHints,InterestCohort")
+chrome_options.add_argument("--disable-sync")
+chrome_options.add_argument("--disable-extensions")
+chrome_options.add_argument("--mute-audio")
+chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+chrome_options.add_argument("--disk-cache-size=1")
+# Block heavy resource types (images/CSS/fonts/media) — we only read anchor hrefs,
+# so skipping them cuts bytes transferred and time-to-interactive per page.
+# JS stays enabled because pagination needs it.
+chrome_options.add_experimental_option("prefs", {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.managed_default_content_settings.stylesheets": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+})
+
+CHROMEDRIVER_PATH = r"C:\Users\Admin\Downloads\chromedriver-win64\chromedriver-win64\chromedriver.exe"
+# A chromedriver left running between invocations (`chromedriver --port=9515`)
+# lets scheduled re-runs skip the 2-4 s browser launch; we attach to it first
+# and only spawn our own binary if nothing is listening.
+REMOTE_DRIVER_URL = "http://127.0.0.1:9515"
+
+# Created lazily by init_driver() — with USE_API we usually never pay the
+# Chrome launch cost at all.
+driver = None
+wait = None
+
+def make_driver():
+    """Attach to the persistent chromedriver if one is up, else spawn Chrome."""
+    try:
+        try:
+            from selenium.webdriver.remote.client_config import ClientConfig
+            client_config = ClientConfig(
+                remote_server_addr=REMOTE_DRIVER_URL,
+                init_args_for_pool_manager={"maxsize": 20},
+            )
+            return webdriver.Remote(command_executor=REMOTE_DRIVER_URL,
+                                    options=chrome_options, client_config=client_config)
+        except ImportError:
+            # older Selenium without ClientConfig
+            return webdriver.Remote(command_executor=REMOTE_DRIVER_URL,
+                                    options=chrome_options)
+    except Exception:
+        service = Service(CHROMEDRIVER_PATH)
+        return webdriver.Chrome(service=service, options=chrome_options)
+
+def wait_until_network_idle(d, idle_ms=500, timeout=10.0):
+    """
+    Return as soon as the document is complete and no new resource fetches have
+    landed for idle_ms. Replaces the old fixed 1.5-2 s sleeps, which always
+    overslept fast loads and undershot slow ones.
+    """
+    deadline = time.monotonic() + timeout
+    last_count = -1
+    quiet_since = None
+    while time.monotonic() < deadline:
+        try:
+            ready, count = d.execute_script(
+                "return [document.readyState, performance.getEntriesByType('resource').length];"
+            )
+        except Exception:
+            return
+        now = time.monotonic()
+        if ready == "complete" and count == last_count:
+            if quiet_since is None:
+                quiet_since = now
+            elif (now - quiet_since) * 1000 >= idle_ms:
+                return
+        else:
+            quiet_since = None
+            last_count = count
+        time.sleep(0.1)
+
+def reset_driver_state(d):
+    """Clear cookies + browser cache between categories instead of re-launching."""
+    try:
+        d.delete_all_cookies()
+        d.execute_cdp_cmd("Network.clearBrowserCache", {})
+    except Exception:
+        pass
+
+class DriverPool:
+    """
+    A bounded pool of preinitialized headless Chrome instances, handed out to
+    category workers via a queue. Wedged drivers are replaced on release so the
+    pool never shrinks.
+    """
+    def __init__(self, size):
+        self._q = queue.Queue()
+        for _ in range(size):
+            self._q.put(make_driver())
+
+    def acquire(self):
+        return self._q.get()
+
+    def release(self, d, broken=False):
+        if broken:
+            try:
+                d.quit()
+            except Exception:
+                pass
+            d = make_driver()
+        else:
+            reset_driver_state(d)
+        self._q.put(d)
+
+    def close_all(self):
+        while not self._q.empty():
+            try:
+                self._q.get_nowait().quit()
+            except Exception:
+                pass
+
+def init_driver():
+    """Create headless Chrome and the shared WebDriverWait (Selenium fallback only)."""
+    global driver, wait
+    if driver is not None:
+        return
+    driver = make_driver()
+    wait = WebDriverWait(driver, 20)
+
+    # Belt-and-braces: also block static assets and trackers at the network layer via CDP,
+    # so even resources not covered by the prefs above never hit the wire.
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": [
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.woff*", "*.svg", "*.mp4", "*.css",
+            "*/analytics*", "*/tracking*", "*doubleclick*", "*googletagmanager*",
+        ]})
+    except Exception:
+        # CDP is Chrome-only; fall back silently if the command isn't supported.
+        pass
+
+# ------------------------------
+# Timing + streaming write helpers
+# ------------------------------
+def now_str():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+# Dedup keys are 8-byte ints, not URL strings: after many runs the file holds
+# 100k+ URLs and a set of str objects costs ~200 B/entry. xxhash gives a fast
+# stable 64-bit digest; the builtin hash is an adequate stand-in within one run
+# (the set is rebuilt from the file at startup anyway).
+try:
+    import xxhash
+    def url_key(url):
+        return xxhash.xxh64_intdigest(url)
+    def page_hash(text):
+        h = xxhash.xxh3_64_intdigest(text)
+        # sqlite3 binds only signed 64-bit INTEGERs; reinterpret the unsigned
+        # digest as two's complement so values >= 2**63 don't overflow.
+        return h - (1 << 64) if h >= (1 << 63) else h
+except ImportError:
+    import hashlib
+    def url_key(url):
+        return hash(url)
+    # page hashes go into the on-disk cache, so they must be stable across runs
+    # (the builtin hash is salted per process)
+    def page_hash(text):
+        # signed for the same sqlite3 64-bit INTEGER bound as the xxhash path
+        return int.from_bytes(
+            hashlib.blake2b(text.encode("utf-8", "ignore"), digest_size=8).digest(),
+            "big", signed=True,
+        )
+
+def load_already_written(path):
+    """
+    Load hashes of existing links from xpaths.txt so we don't re-write duplicates.
+    If the file doesn't exist yet, return an empty set.
+    """
+    if not os.path.exists(path):
+        return set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            # only keep lines that look like URLs
+            return set(url_key(line.strip()) for line in f if line.strip().startswith("http"))
+    except Exception:
+        return set()
+
+def open_out_file(path):
+    """
+    One append-mode handle with a large buffer, kept open for the whole run.
+    Re-opening + flushing per page cost a pile of small write syscalls; with a
+    1 MB buffer the OS sees a handful of big writes instead.
+    """
+    return open(path, "a", buffering=1 << 20, encoding="utf-8")
+
+def append_run_header(fh, start_ts):
+    """
+    Append a visible run header to help auditing:
+    ---- RUN START [timestamp] ----
+    """
+    fh.write(f"\n---- RUN START [{start_ts}] ----\n")
+    fh.flush()
+
+def append_run_footer(fh, end_ts, total_new, total_unique, duration_sec):
+    """
+    Append the run footer:
+    ---- RUN END [timestamp] (new: X, unique: Y, duration: Zs) ----
+    """
+    fh.write(
+        f"---- RUN END   [{end_ts}] (new_written={total_new}, unique_all={total_unique}, duration={duration_sec:.2f}s) ----\n"
+    )
+    fh.flush()
+
+def append_links(fh, links, already_written):
+    """
+    Queue each new link on the buffered handle in one writelines call.
+    Returns how many NEW lines were written.
+    """
+    # No per-page sort: the file is append-only so ordering buys nothing here,
+    # and sorting every page cost K log K per call. Sort offline if needed.
+    new_lines = []
+    for link in links:
+        h = url_key(link)
+        if h not in already_written:
+            new_lines.append(link + "\n")
+            # update the set so later pages/categories don't re-write
+            already_written.add(h)
+    fh.writelines(new_lines)
+    return len(new_lines)
+
+# ------------------------------
+# Page cache (skip re-parsing unchanged pages on re-runs)
+# ------------------------------
+CACHE_PATH = "scrape_cache.db"
+CACHE_MAX_AGE_DAYS = 14
+
+# SQLite connections must never cross fork(), and the parse-pool workers are
+# forked on POSIX — so each process opens its own connection lazily on first
+# use (keyed by pid) instead of inheriting one created at import.
+_CACHE_CONNS = {}
+_CACHE_LOCK = threading.Lock()
+
+def _get_cache():
+    pid = os.getpid()
+    conn = _CACHE_CONNS.get(pid)
+    if conn is None:
+        conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages(cat TEXT, page INT, h INTEGER, links TEXT, ts REAL, "
+            "PRIMARY KEY(cat, page))"
+        )
+        conn.execute("DELETE FROM pages WHERE ts < ?", (time.time() - CACHE_MAX_AGE_DAYS * 86400,))
+        conn.commit()
+        _CACHE_CONNS[pid] = conn
+    return conn
+
+def cached_extract_links(category_name, page_index, page_source):
+    """
+    Hash the rendered HTML; if this (category, page) was seen with the same
+    hash on a previous run, reuse the cached link list and skip the parse.
+    """
+    h = page_hash(page_source)
+    with _CACHE_LOCK:
+        row = _get_cache().execute(
+            "SELECT links FROM pages WHERE cat = ? AND page = ? AND h = ?",
+            (category_name, page_index, h),
+        ).fetchone()
+    if row:
+        return set(json.loads(row[0]))
+    links = extract_links_from_page_source(page_source)
+    with _CACHE_LOCK:
+        cache = _get_cache()
+        cache.execute(
+            "INSERT OR REPLACE INTO pages(cat, page, h, links, ts) VALUES (?, ?, ?, ?, ?)",
+            (category_name, page_index, h, json.dumps(sorted(links)), time.time()),
+        )
+        cache.commit()
+    return links
+
+def canonicalize_links(urls):
+    """
+    Strip tracking query params / fragments and trailing slashes so the same
+    course never appears under multiple variants (?authMode=login, #syllabus)
+    in the set or the output file.
+    """
+    return {u.split("?", 1)[0].split("#", 1)[0].rstrip("/") for u in urls if u}
+
+# ------------------------------
+# Sitemap discovery (cheapest path)
+# ------------------------------
+_SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+def _fetch_sitemap_bytes(url):
+    """GET one sitemap document, transparently ungzipping .gz shards."""
+    if httpx is not None:
+        resp = httpx.get(url, timeout=25, follow_redirects=True)
+    else:
+        resp = requests.get(url, timeout=25)
+    resp.raise_for_status()
+    data = resp.content
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    return data
+
+def _iter_sitemap_locs(data, tag):
+    """Stream <loc> values with iterparse — constant memory even on big shards."""
+    for _, elem in etree.iterparse(io.BytesIO(data), tag=_SITEMAP_NS + tag):
+        loc = elem.findtext(_SITEMAP_NS + "loc")
+        if loc:
+            yield loc.strip()
+        elem.clear()
+
+def discover_from_sitemap():
+    """
+    Walk the sitemap index, follow the course-related shards, and return every
+    /learn/ URL. One compressed XML walk replaces the browser-driven crawl.
+    """
+    index = _fetch_sitemap_bytes(SITEMAP_URL)
+    links = set()
+    shards = [loc for loc in _iter_sitemap_locs(index, "sitemap")
+              if "courses" in loc or "learn" in loc]
+    for shard in shards:
+        try:
+            data = _fetch_sitemap_bytes(shard)
+        except Exception:
+            continue
+        for loc in _iter_sitemap_locs(data, "url"):
+            if "/learn/" in loc:
+                links.add(loc)
+    return canonicalize_links(links)
+
+# ------------------------------
+# API scraping helpers (fallback path)
+# ------------------------------
+def make_api_session():
+    """One pooled requests.Session reused for every API call (keep-alive)."""
+    s = requests.Session()
+    s.headers.update(API_HEADERS)
+    return s
+
+def build_search_payload(query, page):
+    """Mirror the browse page's Search XHR for one results page."""
+    return [{
+        "operationName": "Search",
+        "variables": {
+            "requests": [{
+                "indexName": SEARCH_INDEX,
+                "query": query,
+                "facetFilters": [["productTypeDescription:Courses"]],
+                "page": page,
+                "hitsPerPage": API_HITS_PER_PAGE,
+            }]
+        },
+        "query": SEARCH_QUERY,
+    }]
+
+def extract_links_from_api_json(data):
+    """
+    Walk data.SearchResult.elements[*].productHits[*].objectUrl (shape varies a
+    little between releases, so fall back to scanning for any 'objectUrl' key).
+    Returns (set of absolute course URLs, totalElements or 0).
+    """
+    urls = set()
+    total = 0
+
+    def walk(node):
+        nonlocal total
+        if isinstance(node, dict):
+            obj_url = node.get("objectUrl")
+            if isinstance(obj_url, str) and "/learn/" in obj_url:
+                urls.add(obj_url if obj_url.startswith("http")
+                         else "https://www.coursera.org" + obj_url)
+            te = node.get("totalElements")
+            if isinstance(te, int) and te > total:
+                total = te
+            for v in node.values():
+                walk(v)
+        elif isinstance(node, list):
+            for v in node:
+                walk(v)
+
+    walk(data)
+    return canonicalize_links(urls), total
+
+def discover_categories_via_http(session):
+    """
+    Fetch the browse page once over plain HTTP and pull /browse/<category>
+    anchors out of the static HTML — no browser needed for discovery either.
+    """
+    resp = session.get(BASE_URL, timeout=25)
+    resp.raise_for_status()
+    tree = html.fromstring(resp.text)
+    hrefs = set(tree.xpath("//a[starts-with(@href, '/browse/')]/@href"))
+    categories = {}
+    for href in hrefs:
+        full = "https://www.coursera.org" + href if not href.startswith("http") else href
+        key = href.strip("/").split("/")[-1] or full
+        categories[key] = full
+    return categories
+
+async def fetch_search_page(client, category_name, page):
+    """POST one Search request; returns (links, totalElements)."""
+    resp = await client.post(GRAPHQL_URL, json=build_search_payload(category_name, page))
+    resp.raise_for_status()
+    return extract_links_from_api_json(resp.json())
+
+async def scrape_category_async(client, category_name, sem, out_q):
+    """
+    Scrape one category: page 1 reveals totalElements, then pages 2..N are
+    fetched concurrently (all bounded by the shared semaphore). Results go to
+    the writer queue so disk appends stay serialized.
+    """
+    async with sem:
+        page_links, total = await fetch_search_page(client, category_name, 0)
+    if page_links:
+        await out_q.put((category_name, 1, page_links))
+    if total:
+        n_pages = min(MAX_PAGES, -(-total // API_HITS_PER_PAGE))
+    else:
+        n_pages = 1 if page_links else 0
+
+    async def fetch_one(page):
+        async with sem:
+            links, _ = await fetch_search_page(client, category_name, page)
+        if links:
+            await out_q.put((category_name, page + 1, links))
+
+    await asyncio.gather(*(fetch_one(p) for p in range(1, n_pages)))
+
+async def writer_task(out_q, already_written, global_link_set):
+    """
+    Single consumer draining the queue — preserves the append-only write
+    contract even with many categories in flight. Stops on the None sentinel.
+    """
+    total_new_written = 0
+    while True:
+        item = await out_q.get()
+        if item is None:
+            return total_new_written
+        category_name, page, page_links = item
+        global_link_set |= page_links
+        new_written = append_links(OUT_FH, page_links, already_written)
+        total_new_written += new_written
+        print(f"[{category_name}] API page {page}: +{len(page_links)} "
+              f"(page-new-written={new_written}, total {len(global_link_set)})")
+
+async def run_all(categories, already_written, global_link_set):
+    """Scrape every category concurrently over one shared HTTP/2 client."""
+    sem = asyncio.Semaphore(API_CONCURRENCY)
+    out_q = asyncio.Queue()
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    async with httpx.AsyncClient(http2=True, headers=API_HEADERS,
+                                 limits=limits, timeout=25) as client:
+        writer = asyncio.create_task(writer_task(out_q, already_written, global_link_set))
+        await asyncio.gather(*(scrape_category_async(client, name, sem, out_q)
+                               for name in sorted(categories)))
+        await out_q.put(None)
+        return await writer
+
+def run_api_scrape(already_written, global_link_set):
+    """Discover categories over HTTP, then scrape them all via the search API."""
+    if httpx is None:
+        raise RuntimeError("httpx not installed")
+    categories = discover_categories_via_http(make_api_session())
+    if not categories:
+        raise RuntimeError("no categories discovered via HTTP")
+    print(f"Found {len(categories)} categories via HTTP.")
+    return asyncio.run(run_all(categories, already_written, global_link_set))
+
+# ------------------------------
+# Helpers (unchanged logic, minor edits for streaming)
+# ------------------------------
+def accept_cookies_if_present(d):
+    """
+    Dismiss common cookie banners so elements behind are interactable.
+    Coursera uses OneTrust frequently.
+    """
+    cookie_union = " | ".join([
+        "//*[@id='onetrust-accept-btn-handler']",
+        "//button[normalize-space()='Accept']",
+        "//button[contains(., 'Accept all')]",
+        "//button[contains(@class,'ot-sdk-container')]//button[contains(@id,'accept')]",
+    ])
+    try:
+        for b in d.find_elements(By.XPATH, cookie_union):
+            if b.is_displayed():
+                d.execute_script("arguments[0].click();", b)
+                time.sleep(0.5)
+                return
+    except Exception:
+        pass
+
+def expand_show_more_if_present(d, container):
+    """Reveal hidden chips if 'Show more' exists."""
+    try:
+        for b in container.find_elements(By.XPATH, SHOW_MORE_UNION):
+            if b.is_displayed():
+                d.execute_script("arguments[0].click();", b)
+                time.sleep(0.5)
+                return
+    except Exception:
+        pass
+
+def discover_categories_from_explore_container():
+    """
+    Use your Explore container XPath to find all /browse/* anchors.
+    Returns dict {visible_text: absolute_url}
+    """
+    try:
+        container = wait.until(EC.presence_of_element_located((By.XPATH, EXPLORE_CONTAINER_XPATH)))
+    except Exception:
+        return {}
+    expand_show_more_if_present(driver, container)
+
+    # One execute_script round-trip returns every anchor's fields at once;
+    # reading href/text/aria-label per element would be 4 JSON-RPC round trips
+    # per anchor.
+    try:
+        rows = driver.execute_script("""
+          const root = arguments[0];
+          return [...root.querySelectorAll('a[href*="/browse/"]')].map(a => ({
+            href: a.href, text: (a.innerText||'').trim(),
+            label: a.getAttribute('aria-label')||'', cv: a.getAttribute('data-click-value')||''
+          }));
+        """, container)
+    except Exception:
+        return {}
+
+    categories = {}
+    for row in rows or []:
+        href = (row.get("href") or "").strip()
+        if not href:
+            continue
+        if not href.startswith("http"):
+            href = "https://www.coursera.org" + href
+        text = row.get("text") or row.get("label") or row.get("cv") or href.rsplit("/", 1)[-1]
+        categories[text] = href
+    return categories
+
+def discover_categories_fallback_from_page_source():
+    """
+    If Explore container fails (e.g., headless rendering),
+    scan the whole page for /browse/<category> anchors.
+    """
+    tree = html.fromstring(driver.page_source)
+    hrefs = set(tree.xpath("//a[starts-with(@href, '/browse/')]/@href"))
+    categories = {}
+    for href in hrefs:
+        full = "https://www.coursera.org" + href if not href.startswith("http") else href
+        key = href.strip("/").split("/")[-1] or full
+        categories[key] = full
+    return categories
+
+# Parser/XPath objects built once at module load: reusing one tuned parser and
+# precompiled XPath callables amortizes the setup cost across every page, and
+# skipping comment/PI nodes and ID collection keeps the tree small.
+_PARSER = html.HTMLParser(remove_comments=True, remove_pis=True, collect_ids=False)
+_XP_LEARN = etree.XPath(FALLBACK_LINK_XPATH)
+_XP_ABS = etree.XPath(ABS_LINK_XPATH)
+# Bytes regex for /learn/ hrefs: scans the raw markup in C without building a
+# DOM at all. The lxml path below stays as a fallback for zero-match pages.
+LEARN_RE = re.compile(rb'href="(/learn/[^"#?]+)"')
+
+def extract_links_from_page_source(page_source):
+    """
+    Pull /learn/ hrefs straight out of the raw markup with a compiled bytes
+    regex — no DOM build needed. Only if that finds nothing do we parse with
+    lxml (single-step //a[...]/@href first, deep absolute path last).
+    """
+    src = page_source if isinstance(page_source, bytes) else page_source.encode("utf-8", "ignore")
+    hits = {m.group(1) for m in LEARN_RE.finditer(src)}
+    if hits:
+        return canonicalize_links(
+            "https://www.coursera.org" + h.decode("utf-8", "ignore") for h in hits)
+
+    tree = html.fromstring(page_source, parser=_PARSER)
+    links = _XP_LEARN(tree) or _XP_ABS(tree)
+
+    # Normalize to full URLs
+    full_links = set()
+    for href in links:
+        if not href:
+            continue
+        if href.startswith("http"):
+            full_links.add(href)
+        else:
+            full_links.add("https://www.coursera.org" + href)
+    return canonicalize_links(full_links)
+
+# Lazily-created pool for the HTML-parse fallback, so lxml work runs in
+# separate processes and overlaps with driver round-trips. Requires the
+# __main__ guard below: spawn-based workers re-import this module.
+PARSE_POOL = None
+
+def get_parse_pool():
+    global PARSE_POOL
+    if PARSE_POOL is None:
+        PARSE_POOL = ProcessPoolExecutor(max_workers=2)
+    return PARSE_POOL
+
+def extract_links_via_cdp(d):
+    """
+    Ask the page's own JS runtime for the /learn/ hrefs. Only the small list of
+    URLs crosses the CDP bridge instead of a multi-MB DOM serialization per
+    page. Returns None when CDP isn't available so callers can fall back.
+    """
+    try:
+        res = d.execute_cdp_cmd("Runtime.evaluate", {
+            "expression": "Array.from(document.querySelectorAll('a[href*=\"/learn/\"]'), a => a.href)",
+            "returnByValue": True,
+        })
+        value = res.get("result", {}).get("value")
+        if isinstance(value, list):
+            return canonicalize_links(value)
+    except Exception:
+        pass
+    return None
+
+def find_clickable_next(d, w):
+    """
+    Locate the Next button: one short wait on the union of every candidate
+    XPath, then pick the first enabled hit in Python.
+    """
+    short_wait = WebDriverWait(d, 3)
+    try:
+        btns = short_wait.until(EC.presence_of_all_elements_located((By.XPATH, NEXT_UNION)))
+    except Exception:
+        return None
+    for btn in btns:
+        try:
+            if (btn.get_attribute("disabled") is None) and (btn.get_attribute("aria-disabled") != "true"):
+                return btn
+        except Exception:
+            continue
+    return None
+
+def click_next(d, btn):
+    """Scroll to and click the Next button; try JS click for reliability."""
+    try:
+        d.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
+        d.execute_script("arguments[0].click();", btn)
+        return True
+    except Exception:
+        try:
+            btn.click()
+            return True
+        except Exception:
+            return False
+
+def wait_for_course_grid(w):
+    """
+    Ensure a course link exists before scraping. The specific CSS selector
+    matches a handful of elements instead of every anchor on the page, so the
+    wait resolves with a tiny payload (and CSS beats XPath in Chrome).
+    """
+    try:
+        w.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'a[href*="/learn/"]')))
+    except Exception:
+        time.sleep(1.0)
+
+def scrape_category(d, category_name, category_url, already_written, global_link_set, state_lock):
+    """
+    Visit a category URL, paginate with Next, and collect all /learn/ links.
+    Links are collected per category and committed to the shared set + file in
+    one locked section at the end, so lock contention stays at one acquire per
+    category rather than per link.
+    """
+    w = WebDriverWait(d, 20)
+    d.get(category_url)
+    wait_until_network_idle(d)
+    accept_cookies_if_present(d)
+    wait_for_course_grid(w)
+    page_index = 1
+    category_links = set()
+
+    while page_index <= MAX_PAGES:
+        # Read current page links via CDP; the page_source + lxml fallback is
+        # shipped to the parse pool so the (pure CPU) parse overlaps with
+        # finding and clicking Next below.
+        page_links = extract_links_via_cdp(d)
+        parse_fut = None
+        if page_links is None:
+            parse_fut = get_parse_pool().submit(
+                cached_extract_links, category_name, page_index, d.page_source)
+
+        # Remember the first course href: the page has changed once it differs.
+        # One JS probe per poll beats serializing element handles for a
+        # staleness check.
+        try:
+            old_first = d.execute_script(
+                "return document.querySelector('a[href*=\"/learn/\"]')?.href")
+        except Exception:
+            old_first = None
+
+        # Find & click Next while any fallback parse is still running
+        next_btn = find_clickable_next(d, w)
+        clicked = click_next(d, next_btn) if next_btn else False
+
+        if parse_fut is not None:
+            page_links = parse_fut.result()
+        category_links |= page_links
+        print(f"[{category_name}] Page {page_index}: +{len(page_links)} "
+              f"(category total {len(category_links)})")
+
+        if not next_btn:
+            print(f"[{category_name}] Next button not found or disabled. Stopping.")
+            break
+        if not clicked:
+            print(f"[{category_name}] Failed to click Next button. Stopping.")
+            break
+
+        # Wait until the first course href changes; fall back to network idle
+        try:
+            w.until(lambda drv: drv.execute_script(
+                "return document.querySelector('a[href*=\"/learn/\"]')?.href") != old_first)
+        except Exception:
+            wait_until_network_idle(d)
+
+        page_index += 1
+        time.sleep(PAGE_DELAY_SEC)  # polite delay
+
+    # Commit the whole category under one lock acquire
+    with state_lock:
+        global_link_set |= category_links
+        total_new_written = append_links(OUT_FH, category_links, already_written)
+    return total_new_written
+
+def scrape_category_with_pooled_driver(pool, category_name, category_url,
+                                       already_written, global_link_set, state_lock):
+    """Check a driver out of the pool, scrape one category, return it."""
+    d = pool.acquire()
+    try:
+        new_written = scrape_category(d, category_name, category_url,
+                                      already_written, global_link_set, state_lock)
+    except Exception as e:
+        print(f"[{category_name}] Session error ({e}); replacing pooled driver.")
+        pool.release(d, broken=True)
+        return 0
+    pool.release(d)
+    print(f"=== {category_name}: {len(global_link_set)} unique course links so far "
+          f"(new-written-this-cat={new_written}) ===")
+    return new_written
+
+# ------------------------------
+# Main
+# ------------------------------
+OUT_FH = None  # opened in main(); module-global so the write paths can reach it
+
+def main():
+    global OUT_FH
+    all_links_global = set()
+    already_written = load_already_written(OUT_PATH)
+    OUT_FH = open_out_file(OUT_PATH)
+
+    start_ts = now_str()
+    start_wall = time.monotonic()  # monotonic for elapsed; format wall time only at the ends
+    append_run_header(OUT_FH, start_ts)
+    print(f"== RUN START [{start_ts}] ==")
+
+    # Cheapest path first: the published sitemaps list every /learn/ URL.
+    links_done = False
+    if USE_SITEMAP:
+        try:
+            sitemap_links = discover_from_sitemap()
+            if sitemap_links:
+                all_links_global |= sitemap_links
+                new_written = append_links(OUT_FH, sitemap_links, already_written)
+                print(f"Sitemap: {len(sitemap_links)} course links ({new_written} new-written).")
+                links_done = True
+        except Exception as e:
+            print(f"Sitemap discovery failed ({e}); trying the search API.")
+
+    # Next rung: hit the search API directly (still no browser).
+    if not links_done and USE_API:
+        try:
+            run_api_scrape(already_written, all_links_global)
+            links_done = True
+        except Exception as e:
+            print(f"API scrape failed ({e}); falling back to Selenium.")
+
+    if not links_done:
+        init_driver()
+        try:
+            # 1) Go to base browse page and enumerate categories from Explore
+            driver.get(BASE_URL)
+            wait_until_network_idle(driver)
+            accept_cookies_if_present(driver)
+            categories = discover_categories_from_explore_container()
+            if not categories:
+                # Fallback if Explore container couldn't be located in headless
+                categories = discover_categories_fallback_from_page_source()
+            print(f"Found {len(categories)} categories in Explore.")
+            for name, href in sorted(categories.items()):
+                print(f"- {name}: {href}")
+        finally:
+            driver.quit()
+
+        if not categories:
+            print("WARNING: No categories discovered. Try running non-headless or verify the XPath on the base URL.")
+        else:
+            # 2) Scrape the categories in parallel over a bounded driver pool;
+            #    the shared set and output file are guarded by one lock, taken
+            #    once per category.
+            state_lock = threading.Lock()
+            pool = DriverPool(min(POOL_SIZE, len(categories)))
+            try:
+                with ThreadPoolExecutor(max_workers=POOL_SIZE) as ex:
+                    futures = [
+                        ex.submit(scrape_category_with_pooled_driver, pool, name, url,
+                                  already_written, all_links_global, state_lock)
+                        for name, url in categories.items()
+                    ]
+                    total_new_written_run = sum(f.result() for f in futures)
+            finally:
+                pool.close_all()
+                if PARSE_POOL is not None:
+                    PARSE_POOL.shutdown()
+
+    # End-of-run summary + footer
+    end_ts = now_str()
+    duration_sec = time.monotonic() - start_wall
+    print(f"\nTotal unique course links across all categories: {len(all_links_global)}\n")
+    for link in sorted(all_links_global):
+        print(link)
+
+    append_run_footer(OUT_FH, end_ts, total_new=len(already_written), total_unique=len(all_links_global), duration_sec=duration_sec)
+    OUT_FH.close()
+    print(f"\n== RUN END   [{end_ts}] (unique_all={len(all_links_global)}, duration={duration_sec:.2f}s) ==")
+    print(f"Streaming writes completed. File: {OUT_PATH}")
+
+if __name__ == "__main__":
+    main()
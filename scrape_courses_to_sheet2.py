@@ -1,933 +1,1454 @@
-
-# -*- coding: utf-8 -*-
-"""
-Coursera course scraper (XPath-first) with DEBUG HTML output — v3 (fixed)
-What’s new (v3):
-- Stronger description extractor:
- * Prefers div[4] description; fallback div[5]
- * Filters marketing/testimonial lines
- * Looks for headings like "About this Course" to lock onto canonical copy
- * Tries CSS data-testid, JSON-LD, and meta tags
- * Ranks candidates to pick the most accurate (least marketing, richest text)
-- More robust num_registered: primary → instructor fallback → labelled containers → strict phrase scan
-- Generates per-page debug HTML showing the extracted summary, XPath hit counts, and text previews.
-FIX in this file:
-- Restored helper: extract_offered_by(...) to avoid NameError.
-- Language extraction fixed to use user-provided XPath, stripping "Taught in ".
-- Description filter: drop any line that begins with "Offered by ..." to avoid meta snippets.
-- Rating guard: avoid misreading durations (e.g., "4 weeks") as numeric ratings.
-- Time-to-complete (fixed as requested): prefer exact duration via primary XPath; else fallback XPath; else default "Flexible schedule".
-
-USAGE:
- 1) Set config (URLS_FILE, SERVICE_ACCOUNT_JSON, SPREADSHEET_URL).
- 2) Run: python only_time_bug.py
-
-DEPENDENCIES:
- pip install requests beautifulsoup4 lxml gspread google-auth
-"""
-import os
-import re
-import time
-import traceback
-import pathlib
-import json
-import requests
-from bs4 import BeautifulSoup
-from lxml import html as lxml_html
-from lxml import etree
-try:
-    import gspread
-    from google.oauth2.service_account import Credentials
-except Exception:
-    gspread = None
-    Credentials = None
-
-# --------------------------- CONFIG ---------------------------
-URLS_FILE = r"C:\\Web Scrapping\\xpaths.txt"  # one URL per line
-SERVICE_ACCOUNT_JSON = r"C:\\Web Scrapping\\n8n-integration-bryan-c9074da0d443.json"
-SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1-8cKeEunV0oc1O_8sZCRviU98D6EfA8yR0HOqnFinRo/edit?gid=0#gid=0"
-WORKSHEET_NAME = "Courses"
-REQUEST_TIMEOUT = 25
-REQUEST_DELAY_SEC = 2.0
-MAX_RETRIES = 3
-ENABLE_SHEETS = True  # set False to skip Google Sheets writes
-DEBUG_OUTPUT_DIR = pathlib.Path("debug_html")
-BATCH_SIZE = 5
-
-# --------------------------- COLUMNS ---------------------------
-COLUMNS = [
-    "course_url", "title", "course_category", "course_subcategory",
-    "rating", "language", "Time to complete", "num_modules",
-    "skill_acquire", "description", "experience_required",
-    "num_registered", "course content", "offered_by",
-]
-
-# --------------------------- XPaths ---------------------------
-XPATHS = {
-    # Title fallbacks
-    "title_h1": "//h1",
-    "title_h2": "//h2",
-    "title_tag": "//title/text()",
-
-    # Breadcrumbs
-    "course_category": "/html/body/div[2]/div/main/section[1]/div/div/div/div[1]/nav/ol/li[3]/a",
-    "course_subcategory": "/html/body/div[2]/div/main/section[1]/div/div/div/div[1]/nav/ol/li[4]/a",
-
-    # Rating (primary + fallback)
-    "rating_primary": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[2]/div/div/div[1]",
-    "rating_fallback": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[2]/div/div/div[1]/font/font",
-
-    # Language (user-provided XPath)
-    "language": "/html/body/div[2]/div/main/section[2]/div/div/div[4]/div/div/div[2]/div[2]/div[3]/div/span",
-
-    # Time to complete (primary + fallback provided by you)
-    "time_primary": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[3]/div/div/div[1]",
-    "time_flexible": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[4]/div/div/div[1]",
-
-    # num_modules: read number from span (primary: div[5], fallback: div[4])
-    "num_modules_span_primary": "/html/body/div[2]/div/main/div[5]/div/div/div/div[1]/h2/span",
-    "num_modules_span_fallback": "/html/body/div[2]/div/main/div[4]/div/div/div/div[1]/h2/span",
-
-    # anchor-count container (module tiles/links)
-    "num_modules_anchor_container": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[1]/div/div/div[1]/div/a",
-
-    # skill_acquire ULs
-    "skill_acquire_ul_primary": "/html/body/div[2]/div/main/section[2]/div/div/div[4]/div/div/div[2]/ul",
-    "skill_acquire_ul_fallback": "/html/body/div[2]/div/main/section[2]/div/div/div[4]/div/div/div[1]/ul",
-
-    # description containers (prefer div[4], fallback div[5])
-    "description_container_primary": "/html/body/div[2]/div/main/div[4]/div/div/div/div[1]/div/div",
-    "description_container_fallback": "/html/body/div[2]/div/main/div[5]/div/div/div/div[1]/div/div",
-
-    # experience_required
-    "experience_level": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[3]/div/div/div[1]",
-
-    # num_registered
-    "num_registered": "/html/body/div[2]/div/main/section[2]/div/div/div[1]/div[1]/div/div/div/div[2]/div[4]/p/span/strong/span",
-    # user-requested fallback path (instructor details area)
-    "num_registered_fallback_instructor": "/html/body/div[2]/div/main/div[4]/div/div/div/div[3]/div/div[1]/div[2]/div/div[2]/div[3]/span[3]/span",
-
-    # course content containers (prefer div[4], fallback div[5])
-    "course_content_container_primary": "/html/body/div[2]/div/main/div[4]/div/div/div/div[2]/div/div",
-    "course_content_container_fallback": "/html/body/div[2]/div/main/div[5]/div/div/div/div[2]/div/div",
-
-    # offered_by (primary + alt)
-    "offered_by_primary": "/html/body/div[2]/div/main/div[5]/div/div/div/div[3]/div/div[2]/div[2]/div/div[2]/a/span",
-    "offered_by_alt": "/html/body/div[2]/div/main/div[4]/div/div/div/div[3]/div/div[2]/div[2]/div/div[2]/a/span",
-}
-
-# --------------------------- Utilities ---------------------------
-def clean_text(t: str) -> str:
-    if not t:
-        return ""
-    return re.sub(r"\s+", " ", t).strip()
-
-def fix_text_encoding(s: str) -> str:
-    if not s:
-        return ""
-    replacements = {
-        "â€™": "’", "â€œ": "“", "â€\u009D": "”", "â€“": "–", "â€”": "—",
-        "â€¢": "•", "â€˜": "‘", "â€": "”", "Â": " ", "â€¢": "•", "â€¦": "…",
-    }
-    out = s
-    for bad, good in replacements.items():
-        out = out.replace(bad, good)
-    return clean_text(out)
-
-def extract_numbers(text: str):
-    if not text:
-        return []
-    return [float(x.replace(",", "")) for x in re.findall(r"\b\d[\d,]*\.?\d*\b", text)]
-
-def first_number(text: str):
-    nums = extract_numbers(text)
-    return nums[0] if nums else None
-
-LANGUAGE_MAP = {
-    "EN": "English", "ENG": "English", "ENGLISH": "English",
-    "BM": "Malay", "MS": "Malay", "MALAY": "Malay",
-    "ZH": "Chinese", "CN": "Chinese", "CHINESE": "Chinese",
-    "ES": "Spanish", "ESP": "Spanish", "SPANISH": "Spanish",
-    "FR": "French", "FRENCH": "French",
-    "DE": "German", "GERMAN": "German",
-}
-
-def normalize_language_full(term: str) -> str:
-    t = clean_text(term).upper()
-    if not t:
-        return ""
-    return LANGUAGE_MAP.get(t, clean_text(term))
-
-def create_session():
-    s = requests.Session()
-    s.headers.update({
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    })
-    return s
-
-def fetch_url(session: requests.Session, url: str):
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            resp = session.get(url, timeout=REQUEST_TIMEOUT)
-            if not resp.encoding or resp.encoding.lower() == "iso-8859-1":
-                resp.encoding = resp.apparent_encoding or "utf-8"
-            if 200 <= resp.status_code < 300:
-                return resp
-            elif resp.status_code in (403, 429):
-                time.sleep(REQUEST_DELAY_SEC * attempt)
-            else:
-                time.sleep(REQUEST_DELAY_SEC)
-        except requests.RequestException:
-            time.sleep(REQUEST_DELAY_SEC * attempt)
-    raise RuntimeError(f"Failed to fetch URL after {MAX_RETRIES} attempts: {url}")
-
-def load_urls(file_path: str):
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"URLs file not found: {file_path}")
-    with open(file_path, "r", encoding="utf-8") as f:
-        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
-
-# --------------------------- Filters ---------------------------
-def is_level(s: str) -> bool:
-    return bool(re.search(r"\b(Beginner|Intermediate|Advanced|All Levels)\b", s or "", re.I))
-
-def is_duration(s: str) -> bool:
-    return bool(re.search(r"\b(week|weeks|hour|hours|hr|hrs|minute|minutes|min)\b", s or "", re.I))
-
-def is_noise(line: str) -> bool:
-    if not line:
-        return True
-    l = line.strip()
-    return bool(re.search(r"^(Explore more|Status: Preview|Preview|Learn more)$", l, re.I))
-
-def is_modules_line(line: str) -> bool:
-    if not line:
-        return False
-    l = line.strip().lower()
-    return bool(re.search(r"^\d+\s+modules$", l)) or bool(re.search(r"there are\s+\d+\s+modules", l))
-
-MARKETING_PHRASES = [
-    r"Build your subject-matter expertise",
-    r"This course is part of the .* Specialization",
-    r"When you enroll in this course, you'll also be enrolled",
-    r"Learn new concepts from industry experts",
-    r"Gain a foundational understanding",
-    r"Develop job-relevant skills",
-    r"Earn a shareable career certificate",
-]
-
-def is_marketing(line: str) -> bool:
-    if not line:
-        return False
-    l = line.strip()
-    for pat in MARKETING_PHRASES:
-        if re.search(pat, l, re.I):
-            return True
-    return False
-
-def is_testimonial(line: str) -> bool:
-    if not line:
-        return False
-    l = line.strip()
-    return bool(re.search(r"\bLearner since\b", l, re.I)) or bool(re.search(r"Coursera allows me to learn without limits", l, re.I))
-
-# --------------------------- XPath helpers ---------------------------
-def xp_text(doc, xp: str) -> str:
-    try:
-        nodes = doc.xpath(xp)
-        if not nodes:
-            return ""
-        n = nodes[0]
-        txt = n if isinstance(n, str) else n.text_content()
-        return clean_text(txt)
-    except Exception:
-        return ""
-
-def xp_norm(doc, xp: str) -> str:
-    try:
-        return clean_text(doc.xpath(f"normalize-space({xp})"))
-    except Exception:
-        return ""
-
-# --------------------------- NEW: offered_by cleaner ---------------------------
-def extract_offered_by(raw: str) -> str:
-    """
-    Normalize the 'offered_by' institution string:
-    - Remove 'Offered by'/'Learn more'
-    - Cut trailing marketing ('has', 'is')
-    - Keep first entity-like chunk
-    - Map known short forms
-    """
-    t = clean_text(raw)
-    if not t:
-        return ""
-    # Remove 'Offered by' and 'Learn more'
-    t = re.sub(r"\bOffered by\b.*", "", t, flags=re.I)
-    t = re.sub(r"\bLearn more\b", "", t, flags=re.I)
-    # Keep first chunk (split by dot/bullet/newline)
-    t = re.split(r"[\.•\n]+", t)[0].strip()
-    # Cut at ' has ' / ' is ' to drop marketing blurbs
-    t = re.split(r"\s+(has|is)\s+", t)[0].strip()
-    SHORT_MAP = {"CalArts": "California Institute of the Arts", "MoMA": "The Museum of Modern Art"}
-    return SHORT_MAP.get(t, t)
-
-# --------------------------- Description extraction (hardened) ---------------------------
-def extract_description(doc, soup):
-    raw_source = {}
-
-    def filter_lines(text):
-        parts = re.split(r"(?<=[.!?])\s+|\n+", text)
-        cleaned = []
-        for p in parts:
-            if not p:
-                continue
-            # NEW: drop meta-style opener "Offered by ..."
-            if re.match(r"^\s*Offered by\b", p, flags=re.I):
-                continue
-            if is_marketing(p) or is_testimonial(p):
-                continue
-            cleaned.append(p)
-        return clean_text(" ".join(cleaned))
-
-    candidates = []
-
-    # 1) containers (prefer div[4], then div[5])
-    for label, xp in ("div4", XPATHS["description_container_primary"]), ("div5", XPATHS["description_container_fallback"]):
-        try:
-            nodes = doc.xpath(xp)
-            if nodes:
-                txt = clean_text(nodes[0].text_content())
-                filtered = filter_lines(txt)
-                if filtered:
-                    candidates.append(("container_" + label, filtered))
-                raw_source["container_" + label] = filtered
-        except Exception:
-            pass
-
-    # 2) look for headings indicating canonical description
-    heading_labels = [
-        "About this Course", "About the Course", "Course description",
-        "What you'll learn", "Overview"
-    ]
-    for hxp in ["//h2", "//h3"]:
-        try:
-            for h in doc.xpath(hxp):
-                ht = clean_text(h.text_content())
-                if any(ht.lower() == hl.lower() for hl in heading_labels):
-                    block = h.getparent()
-                    if block is not None:
-                        txt = clean_text(block.text_content())
-                        filtered = filter_lines(txt)
-                        if filtered:
-                            key = "heading_" + ht
-                            candidates.append((key, filtered))
-                            raw_source[key] = filtered
-        except Exception:
-            pass
-
-    # 3) CSS data-testid description
-    try:
-        block = soup.select_one('[data-testid="description"], [data-test="description"]')
-        if block:
-            txt = clean_text(block.get_text(" "))
-            filtered = filter_lines(txt)
-            if filtered:
-                candidates.append(("css_data_testid", filtered))
-                raw_source["css_data_testid"] = filtered
-    except Exception:
-        pass
-
-    # 4) JSON-LD description
-    try:
-        for sc in soup.select('script[type="application/ld+json"]'):
-            try:
-                data = json.loads(sc.string or sc.text or "{}")
-            except Exception:
-                continue
-            nodes = data if isinstance(data, list) else [data]
-            for obj in nodes:
-                if isinstance(obj, dict) and (obj.get("@type") in ("Course", "CreativeWork", None)):
-                    desc = obj.get("description") or obj.get("about")
-                    if isinstance(desc, str) and clean_text(desc):
-                        txt = clean_text(desc)
-                        filtered = filter_lines(txt)
-                        if filtered:
-                            candidates.append(("json_ld", filtered))
-                            raw_source["json_ld"] = filtered
-    except Exception:
-        pass
-
-    # 5) meta tags
-    for sel, key in ("meta[property='og:description']", "og:description"), ("meta[name='description']", "meta:description"):
-        try:
-            tag = soup.select_one(sel)
-            if tag and tag.get("content"):
-                txt = clean_text(tag["content"])
-                filtered = filter_lines(txt)
-                if filtered:
-                    candidates.append((key, filtered))
-                    raw_source[key] = filtered
-        except Exception:
-            pass
-
-    if not candidates:
-        return "", "", raw_source
-
-    # Choose best candidate by score: non-marketing length minus marketing penalty
-    def score(text):
-        length = len(text)
-        penalty = sum(bool(re.search(pat, text, re.I)) for pat in MARKETING_PHRASES) * 100
-        return length - penalty
-
-    best = max(candidates, key=lambda c: score(c[1]))
-    return best[1], best[0], raw_source
-
-# --------------------------- Duration fallback (NEW, compact) ---------------------------
-def extract_duration_from_page(soup) -> str:
-    """
-    Scan raw page text for a simple duration phrase like '4 weeks', '20 hours', etc.
-    Returns a cleaned phrase or '' if not found.
-    """
-    text = clean_text(soup.get_text(" "))
-    m = re.search(r"\b(\d{1,3})\s*(weeks?|hours?|hrs?|minutes?|mins?)\b", text, flags=re.I)
-    if m:
-        qty = m.group(1)
-        unit = m.group(2)
-        # normalize unit pluralization
-        unit_norm = unit.lower()
-        if unit_norm.startswith("hr"):
-            unit_norm = "hours" if qty != "1" else "hour"
-        elif unit_norm.startswith("min"):
-            unit_norm = "minutes" if qty != "1" else "minute"
-        elif unit_norm.startswith("week"):
-            unit_norm = "weeks" if qty != "1" else "week"
-        elif unit_norm.startswith("hour"):
-            unit_norm = "hours" if qty != "1" else "hour"
-        elif unit_norm.startswith("minute"):
-            unit_norm = "minutes" if qty != "1" else "minute"
-        return f"{qty} {unit_norm}"
-    return ""
-
-# --------------------------- Extractor ---------------------------
-def extract_by_xpaths(html_text: str, url: str) -> dict:
-    doc = lxml_html.fromstring(html_text)
-    soup = BeautifulSoup(html_text, "lxml")
-    raw_debug = {}
-
-    # Title
-    title = xp_text(doc, XPATHS["title_h1"]) or xp_text(doc, XPATHS["title_h2"]) or xp_text(doc, XPATHS["title_tag"])
-
-    # Category/Subcategory
-    course_category = xp_norm(doc, XPATHS["course_category"])
-    course_subcategory = xp_norm(doc, XPATHS["course_subcategory"])
-    raw_debug["course_category_raw"] = course_category
-    raw_debug["course_subcategory_raw"] = course_subcategory
-
-    # Rating (with guard to avoid durations)
-    rating_txt = xp_text(doc, XPATHS["rating_primary"]) or xp_text(doc, XPATHS["rating_fallback"])
-    rating_val = None
-    if rating_txt and not is_duration(rating_txt):
-        # Look for patterns typical of ratings, e.g., "4.8", "4.8 stars", "4.8 out of 5"
-        m = re.search(r"\b(\d\.\d)\b(?:\s*(?:stars?|out of 5))?", rating_txt, flags=re.I)
-        if m:
-            try:
-                rating_val = float(m.group(1))
-            except Exception:
-                rating_val = None
-        else:
-            # fallback to first number only if it does NOT look like weeks/hours
-            if not re.search(r"\b(week|weeks|hour|hours|hr|hrs|minute|minutes|min)\b", rating_txt, re.I):
-                rating_val = first_number(rating_txt)
-    rating = rating_val if isinstance(rating_val, (int, float)) else "N/A"
-    raw_debug["rating_raw"] = rating_txt
-
-    # Language (UPDATED logic)
-    language_raw = xp_text(doc, XPATHS["language"]) or (soup.find("html").get("lang") if soup.find("html") else "")
-    # Strip "Taught in " prefix if present
-    if language_raw:
-        language_raw = re.sub(r"^\s*Taught in\s+", "", language_raw, flags=re.I).strip()
-    language = normalize_language_full(language_raw) if language_raw else "N/A"
-    raw_debug["language_raw"] = language_raw
-
-    # -------------------- Time to complete (ONLY CHANGE) --------------------
-    # Prefer explicit duration via primary XPath;
-    # else use fallback XPath;
-    # else default to "Flexible schedule".
-    time_txt_primary = xp_text(doc, XPATHS["time_primary"])
-    time_txt = None
-    if is_duration(time_txt_primary):
-        time_txt = time_txt_primary
-    else:
-        time_txt_fallback = xp_text(doc, XPATHS["time_flexible"])
-        time_txt = time_txt_fallback if is_duration(time_txt_fallback) else (time_txt_fallback or "Flexible schedule")
-
-    time_to_complete = clean_text(time_txt) if time_txt else "Flexible schedule"
-    raw_debug["time_primary_raw"] = time_txt_primary
-    raw_debug["time_flexible_raw"] = xp_text(doc, XPATHS["time_flexible"])
-    # -----------------------------------------------------------------------
-
-    # experience_required
-    exp_candidate = time_txt_primary
-    experience_required = clean_text(exp_candidate) if is_level(exp_candidate) else ""
-    if not experience_required:
-        tag = soup.select_one('[data-testid="level"], [data-test="level"]')
-        if tag and is_level(tag.get_text()):
-            experience_required = clean_text(tag.get_text())
-    if not experience_required:
-        try:
-            parent_nodes = doc.xpath("/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]")
-            if parent_nodes:
-                txt_block = clean_text(parent_nodes[0].text_content())
-                m = re.search(r"\b(Beginner|Intermediate|Advanced|All Levels)\b", txt_block, re.I)
-                if m:
-                    experience_required = m.group(0)
-        except Exception:
-            pass
-    if not experience_required:
-        experience_required = "N/A"
-    raw_debug["experience_required_raw"] = exp_candidate
-
-    # num_modules (span → fallback → anchor count → module headings)
-    num_modules_span_primary = xp_text(doc, XPATHS["num_modules_span_primary"])
-    num_modules_span_fallback = xp_text(doc, XPATHS["num_modules_span_fallback"]) if not num_modules_span_primary else ""
-    num_modules_txt = num_modules_span_primary or num_modules_span_fallback
-    num_modules_val = first_number(num_modules_txt)
-
-    num_modules_anchor_count = 0
-    if num_modules_val is None:
-        try:
-            anchor_nodes = doc.xpath(XPATHS["num_modules_anchor_container"])
-            num_modules_anchor_count = len(anchor_nodes)
-            if num_modules_anchor_count > 0:
-                num_modules_val = float(num_modules_anchor_count)
-        except Exception:
-            pass
-
-    if num_modules_val is None:
-        mod_headings = soup.select('[data-testid="module"] h3')
-        num_modules_val = len(mod_headings) if mod_headings else None
-
-    num_modules = int(num_modules_val) if isinstance(num_modules_val, (int, float)) else "N/A"
-    raw_debug["num_modules_span_primary_raw"] = num_modules_span_primary
-    raw_debug["num_modules_span_fallback_raw"] = num_modules_span_fallback
-    raw_debug["num_modules_anchor_count"] = num_modules_anchor_count
-
-    # skill_acquire
-    skill_items = []
-    for xp in (XPATHS["skill_acquire_ul_primary"], XPATHS["skill_acquire_ul_fallback"]):
-        try:
-            ul_nodes = doc.xpath(xp)
-            if ul_nodes:
-                for ul in ul_nodes:
-                    for li in ul.xpath(".//li"):
-                        txt_li = clean_text(li.text_content())
-                        if txt_li and not re.search(r"^view all skills$", txt_li, re.I):
-                            skill_items.append(txt_li)
-                break
-        except Exception:
-            continue
-    skill_acquire = "; ".join(skill_items) if skill_items else "N/A"
-    raw_debug["skill_ul_count"] = len(skill_items)
-
-    # description (robust extractor)
-    description_txt, desc_source, desc_sources_raw = extract_description(doc, soup)
-    description = fix_text_encoding(description_txt) if description_txt else "N/A"
-    raw_debug.update({f"description_source": desc_source, **{f"desc_src_{k}": v for k, v in desc_sources_raw.items()}})
-
-    # --- num_registered with multiple fallbacks ---
-    reg_txt = xp_text(doc, XPATHS["num_registered"]) or xp_text(doc, XPATHS["num_registered_fallback_instructor"])
-    reg_val = first_number(reg_txt)
-    if reg_val is None:
-        probable_xpaths = [
-            "//section[contains(., 'learners') or contains(., 'students')]",
-            "//div[contains(., 'learners') or contains(., 'students')]",
-            "//span[contains(., 'learners') or contains(., 'students')]",
-        ]
-        for xp in probable_xpaths:
-            try:
-                nodes = doc.xpath(xp)
-                for n in nodes:
-                    txt = clean_text(n.text_content())
-                    m = re.search(r"\b([\d,]+)\b\s*(learners|students|enrolled)", txt, re.I)
-                    if m:
-                        reg_val = float(m.group(1).replace(",", ""))
-                        break
-                if reg_val is not None:
-                    break
-            except Exception:
-                continue
-    if reg_val is None:
-        page_text = clean_text(soup.get_text(" "))
-        m = re.search(r"\b([\d,]+)\b\s*(learners|students|enrolled)", page_text, re.I)
-        if m:
-            try:
-                reg_val = float(m.group(1).replace(",", ""))
-            except Exception:
-                reg_val = None
-    num_registered = int(reg_val) if isinstance(reg_val, (int, float)) else "N/A"
-    raw_debug["num_registered_raw"] = reg_txt
-
-    # course content (prefer div[4], then div[5], then fallbacks)
-    course_content_txt = ""
-    for xp in (XPATHS["course_content_container_primary"], XPATHS["course_content_container_fallback"]):
-        try:
-            nodes = doc.xpath(xp)
-            if nodes:
-                parts = []
-                container = nodes[0]
-                for h in container.xpath(".//h2|.//h3"):
-                    ht = clean_text(h.text_content())
-                    if ht and not is_noise(ht) and not is_modules_line(ht):
-                        parts.append(ht)
-                for li in container.xpath(".//li"):
-                    lt = clean_text(li.text_content())
-                    if lt and not is_noise(lt) and not is_modules_line(lt):
-                        parts.append(lt)
-                if not parts:
-                    for p in container.xpath(".//p"):
-                        pt = clean_text(p.text_content())
-                        if pt and not is_noise(pt) and not is_modules_line(pt):
-                            parts.append(pt)
-                course_content_txt = "\n".join(parts) if parts else clean_text(container.text_content())
-                course_content_txt = "\n".join([
-                    l for l in course_content_txt.splitlines()
-                    if l.strip() and not is_noise(l) and not is_modules_line(l)
-                ])
-                if course_content_txt:
-                    break
-        except Exception:
-            continue
-
-    # Fallbacks only if the strict containers were empty
-    if not course_content_txt:
-        parts_fb = []
-        try:
-            anchor_nodes = doc.xpath(XPATHS["num_modules_anchor_container"])
-            for a in anchor_nodes:
-                atxt = clean_text(a.text_content())
-                if atxt and not is_noise(atxt) and not is_modules_line(atxt):
-                    parts_fb.append(atxt)
-        except Exception:
-            pass
-        for h in soup.select('[data-testid="module"] h3'):
-            ht = clean_text(h.get_text())
-            if ht and not is_noise(ht) and not is_modules_line(ht):
-                parts_fb.append(ht)
-        for li in soup.select('[data-testid="syllabus"] li'):
-            lt = clean_text(li.get_text())
-            if lt and not is_noise(lt) and not is_modules_line(lt):
-                parts_fb.append(lt)
-        if parts_fb:
-            course_content_txt = "\n".join(parts_fb)
-
-    course_content = course_content_txt if course_content_txt else "N/A"
-    raw_debug["course_content_raw"] = course_content_txt
-
-    # offered_by: primary → alt → text fallback ("Offered by …") → clean
-    offered_by_raw = ""
-    try:
-        nodes = doc.xpath(XPATHS["offered_by_primary"])
-        if nodes:
-            direct_texts = nodes[0].xpath("text()")
-            offered_by_raw = clean_text(" ".join(direct_texts))
-        if not offered_by_raw:
-            nodes_alt = doc.xpath(XPATHS["offered_by_alt"])
-            if nodes_alt:
-                direct_texts_alt = nodes_alt[0].xpath("text()")
-                offered_by_raw = clean_text(" ".join(direct_texts_alt))
-    except Exception:
-        offered_by_raw = ""
-
-    offered_by_fallback_text = ""
-    if not offered_by_raw:
-        page_text = soup.get_text(" ")
-        m = re.search(r"Offered by\s*[:\-]?\s*(.+?)\s{2,}$", page_text, re.I)
-        if m:
-            offered_by_fallback_text = clean_text(m.group(1))
-            offered_by_raw = offered_by_fallback_text
-
-    offered_by = extract_offered_by(offered_by_raw) if offered_by_raw else "Coursera"
-    raw_debug["offered_by_raw_primary"] = offered_by_raw
-    raw_debug["offered_by_fallback_text"] = offered_by_fallback_text
-
-    row = {
-        "course_url": url,
-        "title": title if title else "N/A",
-        "course_category": course_category if course_category else "N/A",
-        "course_subcategory": course_subcategory if course_subcategory else "N/A",
-        "rating": rating,
-        "language": language,
-        "Time to complete": time_to_complete,
-        "num_modules": num_modules,
-        "skill_acquire": skill_acquire,
-        "description": description,
-        "experience_required": experience_required,
-        "num_registered": num_registered,
-        "course content": course_content,
-        "offered_by": offered_by,
-    }
-
-    debug_print_focus(url, row, raw_debug)
-    return row
-
-# --------------------------- Google Sheets I/O ---------------------------
-def get_gsheet_client():
-    if not ENABLE_SHEETS:
-        return None
-    if gspread is None or Credentials is None:
-        raise RuntimeError("gspread/google-auth not installed. Set ENABLE_SHEETS=False to skip.")
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_JSON, scopes=scopes)
-    return gspread.authorize(creds)
-
-def ensure_sheet_and_header(client):
-    if not client:
-        return None, None
-    sh = client.open_by_url(SPREADSHEET_URL)
-    try:
-        ws = sh.worksheet(WORKSHEET_NAME)
-    except Exception:
-        ws = sh.add_worksheet(title=WORKSHEET_NAME, rows=2000, cols=len(COLUMNS))
-    header = ws.row_values(1)
-    if header != COLUMNS:
-        ws.update("A1", [COLUMNS])
-    return sh, ws
-
-def append_rows(ws, rows: list):
-    if not ws or not rows:
-        return
-    values = []
-    for r in rows:
-        row = []
-        for col in COLUMNS:
-            v = r.get(col, "")
-            row.append("N/A" if (isinstance(v, str) and v == "") or v is None else v)
-        values.append(row)
-    ws.append_rows(values, value_input_option="USER_ENTERED")
-
-# --------------------------- Debug HTML helper ---------------------------
-HIGHLIGHT_COLORS = ["#e53935", "#8e24aa", "#3949ab", "#1e88e5", "#00897b",
-                    "#7cb342", "#fdd835", "#fb8c00", "#6d4c41", "#546e7a"]
-
-def _wrap_node_with_style(node, color, label):
-    if not isinstance(node, etree._Element):
-        return
-    existing_style = node.get("style", "")
-    outline = f"outline: 3px dashed {color}; outline-offset: 2px;"
-    node.set("style", (existing_style + "; " + outline).strip("; "))
-    node.set("data-debug-label", label)
-
-def _find_nodes(doc, xp):
-    try:
-        return doc.xpath(xp)
-    except Exception:
-        return []
-
-def _collect_text_preview(node, max_len=800):
-    try:
-        txt = node.text_content()
-    except Exception:
-        txt = ""
-    txt = re.sub(r"\s+", " ", txt).strip()
-    return (txt[:max_len] + "…") if len(txt) > max_len else txt
-
-def highlight_html_with_xpaths(html_text, xpaths_dict):
-    doc = lxml_html.fromstring(html_text)
-    matches = {}
-    for i, (label, xp) in enumerate(xpaths_dict.items()):
-        color = HIGHLIGHT_COLORS[i % len(HIGHLIGHT_COLORS)]
-        nodes = _find_nodes(doc, xp)
-        previews = []
-        for n in nodes:
-            _wrap_node_with_style(n, color, label)
-            previews.append(_collect_text_preview(n))
-        matches[label] = {"count": len(nodes), "color": color, "xpath": xp, "previews": previews}
-    modified_html = etree.tostring(doc, encoding="unicode", method="html")
-    return modified_html, matches
-
-def _summary_table(row):
-    headers = COLUMNS
-    tr_rows = []
-    from html import escape
-    for h in headers:
-        v = escape(str(row.get(h, "")))
-        tr_rows.append(f"<tr><th>{escape(h)}</th><td>{v}</td></tr>")
-    return "\n".join(tr_rows)
-
-def save_debug_html(url, html_text, row, xpaths_dict, out_path):
-    from html import escape
-    modified_html, matches = highlight_html_with_xpaths(html_text, xpaths_dict)
-
-    legend_items = []
-    for label, info in matches.items():
-        color, count, xp = info["color"], info["count"], escape(info["xpath"])
-        legend_items.append(
-            f"<li><span class='swatch' style='background:{color}'></span>"
-            f"<strong>{escape(label)}</strong> — <code>{xp}</code> • hits: <strong>{count}</strong></li>"
-        )
-    legend_html = "\n".join(legend_items)
-
-    previews = []
-    for label, info in matches.items():
-        items, color, xp = info["previews"], info["color"], escape(info["xpath"])
-        body = "\n".join(
-            f"<li><div class='preview' style='border-left:6px solid {color}'>"
-            f"<div class='preview-xp'><code>{xp}</code></div>"
-            f"<div class='preview-txt'>{escape(p)}</div>"
-            f"</div></li>" for p in items
-        )
-    previews.append(
-        f"<details class='preview-block' open><summary><span class='swatch' style='background:{color}'></span>"
-        f"{escape(label)} ({len(items)} matches)</summary><ul>{body}</ul></details>"
-    )
-    previews_html = "\n".join(previews)
-
-    srcdoc = escape(modified_html)
-
-    out = f"""<!DOCTYPE html>
-<html lang='en'>
-<head><meta charset='utf-8' /><title>Coursera Debug — {escape(url)}</title>
-<style>
-body {{ margin:0; font-family: system-ui, -apple-system, Segoe UI, Roboto, Ubuntu, sans-serif; }}
-header {{ position: sticky; top: 0; background: #0f172a; color: #fff; padding: 10px 16px; z-index: 9999; }}
-header h1 {{ font-size: 16px; margin: 0; }}
-.container {{ display: grid; grid-template-columns: 420px 1fr; min-height: 100vh; }}
-.sidebar {{ padding: 12px 16px; border-right: 1px solid #e2e8f0; overflow: auto; max-height: calc(100vh - 48px); }}
-.main {{ height: calc(100vh - 48px); }}
-iframe {{ width: 100%; height: 100%; border: 0; background: #fff; }}
-.swatch {{ display:inline-block; width:14px; height:14px; border-radius:2px; margin-right:6px; vertical-align:middle; }}
-.sidebar h2 {{ font-size:15px; margin:16px 0 8px; color:#0f172a; }}
-.sidebar table {{ width:100%; border-collapse:collapse; font-size:13px; }}
-.sidebar th {{ text-align:left; width:160px; color:#334155; vertical-align:top; padding:6px 4px; border-bottom:1px solid #e2e8f0; }}
-.sidebar td {{ padding:6px 4px; border-bottom:1px solid #e2e8f0; }}
-.preview-block summary {{ cursor:pointer; font-weight:600; }}
-.preview {{ background:#f8fafc; margin:4px 0; padding:6px 8px; border-radius:4px; }}
-.preview-xp {{ color:#64748b; font-size:12px; margin-bottom:4px; }}
-.preview-txt {{ white-space: pre-wrap; font-size:13px; }}
-footer {{ font-size:12px; color:#64748b; padding:8px 16px; border-top:1px solid #e2e8f0; }}
-</style></head>
-<body>
-<header><h1>Debugging extraction for: {escape(url)}</h1></header>
-<div class='container'>
-  <aside class='sidebar'>
-    <h2>Extracted summary</h2>
-    <table>{_summary_table(row)}</table>
-    <h2>XPath legend</h2>
-    <ul>{legend_html}</ul>
-    <h2>Matched text previews</h2>
-    {previews_html}
-  </aside>
-  <main class='main'>
-    <iframe srcdoc="{srcdoc}"></iframe>
-  </main>
-</div>
-<footer>
- This debug page outlines nodes matched by your XPaths (dashed boxes). If counts are 0, the absolute XPath likely does not exist for this course variation.
-</footer>
-</body></html>"""
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(out)
-    return str(out_path)
-
-# --------------------------- Printing ---------------------------
-def debug_print_focus(url: str, row: dict, raw_debug: dict):
-    print("\n================ XPATH DEBUG ================")
-    print(f"course_url : {url}")
-    print(f"title : {row.get('title')}")
-    print(f"course_category : {row.get('course_category')}")
-    print(f"course_subcategory: {row.get('course_subcategory')}")
-    print(f"rating : {row.get('rating')}")
-    print(f"language : {row.get('language')}")
-    print(f"Time to complete : {row.get('Time to complete')}")
-    print(f"num_modules : {row.get('num_modules')}")
-    print(f"skill_acquire : {row.get('skill_acquire')}")
-    print(f"description : {row.get('description')[:800]}")
-    print(f"experience_required: {row.get('experience_required')}")
-    print(f"num_registered : {row.get('num_registered')}")
-    print(f"course content : {row.get('course content')[:400]}")
-    print(f"offered_by : {row.get('offered_by')}")
-    print("---- RAW MATCHES ----")
-    for k, v in raw_debug.items():
-        pv = v if isinstance(v, str) else str(v)
-        print(f"{k:<30}: {pv[:400]}")
-    print("============================================\n")
-
-# --------------------------- Main ---------------------------
-def sanitize_filename(s: str) -> str:
-    s = re.sub(r"[^A-Za-z0-9._-]+", "_", s)
-    return s[:100]
-
-def main():
-    urls = load_urls(URLS_FILE)
-    session = create_session()
-    DEBUG_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-
-    ENABLE_SHEETS_FLAG = False
-    client = None
-    ws = None
-    if ENABLE_SHEETS:
-        try:
-            client = get_gsheet_client()
-            sh, ws = ensure_sheet_and_header(client)
-            ENABLE_SHEETS_FLAG = True
-        except Exception as e:
-            print(f"[WARN] Google Sheets disabled due to: {e}")
-            ENABLE_SHEETS_FLAG = False
-
-    batch = []
-    for i, url in enumerate(urls, start=1):
-        try:
-            print(f"[{i}/{len(urls)}] Fetching: {url}")
-            resp = fetch_url(session, url)
-
-            # Extract
-            row = extract_by_xpaths(resp.text, url)
-            batch.append(row)
-
-            # Save raw HTML
-            raw_name = sanitize_filename(f"{i:03d}_raw.html")
-            with open(DEBUG_OUTPUT_DIR / raw_name, "w", encoding="utf-8") as f:
-                f.write(resp.text)
-
-            # Debug HTML with highlighted nodes + previews
-            xpaths_to_check = {
-                "course_content (div[4])": XPATHS["course_content_container_primary"],
-                "course_content (div[5])": XPATHS["course_content_container_fallback"],
-                "description (div[4])": XPATHS["description_container_primary"],
-                "description (div[5])": XPATHS["description_container_fallback"],
-                "num_registered (primary)": XPATHS["num_registered"],
-                "num_registered (instructor fallback)": XPATHS["num_registered_fallback_instructor"],
-            }
-            dbg_name = sanitize_filename(f"{i:03d}_debug.html")
-            save_debug_html(url, resp.text, row, xpaths_to_check, DEBUG_OUTPUT_DIR / dbg_name)
-
-            # Push to Sheets in small batches
-            if ENABLE_SHEETS_FLAG and len(batch) >= BATCH_SIZE:
-                append_rows(ws, batch)
-                batch = []
-
-            time.sleep(REQUEST_DELAY_SEC)
-        except Exception as e:
-            print(f"Error processing {url}: {e}")
-            traceback.print_exc()
-            time.sleep(REQUEST_DELAY_SEC)
-
-    if ENABLE_SHEETS_FLAG and batch:
-        append_rows(ws, batch)
-
-    print("Done.")
-
-if __name__ == "__main__":
-    print("Starting Coursera scrape (XPath-first) with debug HTML v3…")
-    main()
-
+
+# -*- coding: utf-8 -*-
+"""
+Coursera course scraper (XPath-first) with DEBUG HTML output — v3 (fixed)
+What’s new (v3):
+- Stronger description extractor:
+ * Prefers div[4] description; fallback div[5]
+ * Filters marketing/testimonial lines
+ * Looks for headings like "About this Course" to lock onto canonical copy
+ * Tries CSS data-testid, JSON-LD, and meta tags
+ * Ranks candidates to pick the most accurate (least marketing, richest text)
+- More robust num_registered: primary → instructor fallback → labelled containers → strict phrase scan
+- Generates per-page debug HTML showing the extracted summary, XPath hit counts, and text previews.
+FIX in this file:
+- Restored helper: extract_offered_by(...) to avoid NameError.
+- Language extraction fixed to use user-provided XPath, stripping "Taught in ".
+- Description filter: drop any line that begins with "Offered by ..." to avoid meta snippets.
+- Rating guard: avoid misreading durations (e.g., "4 weeks") as numeric ratings.
+- Time-to-complete (fixed as requested): prefer exact duration via primary XPath; else fallback XPath; else default "Flexible schedule".
+
+USAGE:
+ 1) Set config (URLS_FILE, SERVICE_ACCOUNT_JSON, SPREADSHEET_URL).
+ 2) Run: python only_time_bug.py
+ 3) Optional: set SCRAPER_DEBUG=1 to dump raw/debug HTML per URL and print
+    per-field extraction traces (off by default — it writes two large files
+    per page).
+
+DEPENDENCIES:
+ pip install requests lxml gspread google-auth
+"""
+import os
+import re
+import time
+import datetime
+import pathlib
+import json
+import hashlib
+import asyncio
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from string import Template
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None  # falls back to the serial requests loop
+try:
+    import requests_cache
+except Exception:
+    requests_cache = None  # no cross-run HTTP cache; every page is refetched
+try:
+    import httpx
+except Exception:
+    httpx = None  # no HTTP/2 multiplexing; plain requests keep-alive instead
+try:
+    import orjson
+
+    def _json_loads(s):
+        return orjson.loads(s if isinstance(s, (bytes, bytearray)) else s.encode("utf-8"))
+except Exception:
+    _json_loads = json.loads  # stdlib fallback for the JSON-LD blocks
+from lxml import etree
+# requests/aiohttp/httpx only decode `br` responses when a brotli binding is
+# installed; advertising it without one makes Coursera send bodies nothing
+# here can decompress.
+try:
+    import brotli  # noqa: F401
+    _HAS_BROTLI = True
+except Exception:
+    try:
+        import brotlicffi  # noqa: F401
+        _HAS_BROTLI = True
+    except Exception:
+        _HAS_BROTLI = False
+try:
+    import gspread
+    from google.oauth2.service_account import Credentials
+    from google.auth.transport.requests import Request as _GoogleAuthRequest
+except Exception:
+    gspread = None
+    Credentials = None
+
+# --------------------------- CONFIG ---------------------------
+URLS_FILE = r"C:\\Web Scrapping\\xpaths.txt"  # one URL per line
+SERVICE_ACCOUNT_JSON = r"C:\\Web Scrapping\\n8n-integration-bryan-c9074da0d443.json"
+SPREADSHEET_URL = "https://docs.google.com/spreadsheets/d/1-8cKeEunV0oc1O_8sZCRviU98D6EfA8yR0HOqnFinRo/edit?gid=0#gid=0"
+WORKSHEET_NAME = "Courses"
+REQUEST_TIMEOUT = 25
+# Hard cap on page size; anything larger (or non-HTML) is a redirect gone
+# wrong, not a course page, and is not worth decoding or parsing.
+MAX_RESPONSE_BYTES = 2_000_000
+REQUEST_DELAY_SEC = 2.0
+MAX_RETRIES = 3
+ENABLE_SHEETS = True  # set False to skip Google Sheets writes
+# Debug instrumentation (raw-match capture, console dump, HTML reports) is
+# pure overhead in production; set SCRAPER_DEBUG=1 to turn it back on.
+DEBUG = os.environ.get("SCRAPER_DEBUG") == "1"
+DEBUG_OUTPUT_DIR = pathlib.Path("debug_html")
+# Raw-HTML cache keyed by sha1(url): the extracted row is a pure function of
+# the page, so a cache hit skips the network entirely on re-runs. Set
+# SCRAPER_REFRESH=1 to force refetching.
+HTML_CACHE_DIR = pathlib.Path("html_cache")
+REFRESH = os.environ.get("SCRAPER_REFRESH") == "1"
+# Rows accumulated before one append_rows call. One HTTP round-trip per ~500
+# rows instead of per 5 keeps well clear of the Sheets 429 quota. Fetch
+# parallelism is governed separately by FETCH_CONCURRENCY below.
+SHEETS_FLUSH_ROWS = 500
+
+# --------------------------- COLUMNS ---------------------------
+COLUMNS = [
+    "course_url", "title", "course_category", "course_subcategory",
+    "rating", "language", "Time to complete", "num_modules",
+    "skill_acquire", "description", "experience_required",
+    "num_registered", "course content", "offered_by",
+]
+
+# --------------------------- XPaths ---------------------------
+XPATHS = {
+    # Title fallbacks
+    "title_h1": "//h1",
+    "title_h2": "//h2",
+    "title_tag": "//title/text()",
+
+    # Breadcrumbs
+    "course_category": "/html/body/div[2]/div/main/section[1]/div/div/div/div[1]/nav/ol/li[3]/a",
+    "course_subcategory": "/html/body/div[2]/div/main/section[1]/div/div/div/div[1]/nav/ol/li[4]/a",
+
+    # Rating (primary + fallback)
+    "rating_primary": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[2]/div/div/div[1]",
+    "rating_fallback": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[2]/div/div/div[1]/font/font",
+
+    # Language (user-provided XPath)
+    "language": "/html/body/div[2]/div/main/section[2]/div/div/div[4]/div/div/div[2]/div[2]/div[3]/div/span",
+
+    # Time to complete (primary + fallback provided by you)
+    "time_primary": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[3]/div/div/div[1]",
+    "time_flexible": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[4]/div/div/div[1]",
+
+    # num_modules: read number from span (primary: div[5], fallback: div[4])
+    "num_modules_span_primary": "/html/body/div[2]/div/main/div[5]/div/div/div/div[1]/h2/span",
+    "num_modules_span_fallback": "/html/body/div[2]/div/main/div[4]/div/div/div/div[1]/h2/span",
+
+    # anchor-count container (module tiles/links)
+    "num_modules_anchor_container": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[1]/div/div/div[1]/div/a",
+
+    # skill_acquire ULs
+    "skill_acquire_ul_primary": "/html/body/div[2]/div/main/section[2]/div/div/div[4]/div/div/div[2]/ul",
+    "skill_acquire_ul_fallback": "/html/body/div[2]/div/main/section[2]/div/div/div[4]/div/div/div[1]/ul",
+
+    # description containers (prefer div[4], fallback div[5])
+    "description_container_primary": "/html/body/div[2]/div/main/div[4]/div/div/div/div[1]/div/div",
+    "description_container_fallback": "/html/body/div[2]/div/main/div[5]/div/div/div/div[1]/div/div",
+
+    # experience_required
+    "experience_level": "/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]/div[3]/div/div/div[1]",
+
+    # num_registered
+    "num_registered": "/html/body/div[2]/div/main/section[2]/div/div/div[1]/div[1]/div/div/div/div[2]/div[4]/p/span/strong/span",
+    # user-requested fallback path (instructor details area)
+    "num_registered_fallback_instructor": "/html/body/div[2]/div/main/div[4]/div/div/div/div[3]/div/div[1]/div[2]/div/div[2]/div[3]/span[3]/span",
+
+    # course content containers (prefer div[4], fallback div[5])
+    "course_content_container_primary": "/html/body/div[2]/div/main/div[4]/div/div/div/div[2]/div/div",
+    "course_content_container_fallback": "/html/body/div[2]/div/main/div[5]/div/div/div/div[2]/div/div",
+
+    # offered_by (primary + alt)
+    "offered_by_primary": "/html/body/div[2]/div/main/div[5]/div/div/div/div[3]/div/div[2]/div[2]/div/div[2]/a/span",
+    "offered_by_alt": "/html/body/div[2]/div/main/div[4]/div/div/div/div[3]/div/div[2]/div[2]/div/div[2]/a/span",
+}
+
+# One tuned parser reused for every page: recover handles Coursera's slightly
+# malformed markup, and skipping comments/blank text keeps the tree small so
+# the absolute-path XPaths below traverse fewer nodes.
+_HTML_PARSER = etree.HTMLParser(
+    recover=True, remove_comments=True, remove_blank_text=True, huge_tree=True,
+    collect_ids=False)
+
+# Every XPath is compiled once at import: evaluating a compiled callable skips
+# re-parsing the expression string on each of the dozens of calls per page.
+COMPILED = {k: etree.XPath(v) for k, v in XPATHS.items()}
+COMPILED_NS = {k: etree.XPath(f"normalize-space({v})") for k, v in XPATHS.items()}
+# Heading scan for the description extractor, compiled once as well.
+HEADING_XPATHS = [etree.XPath("//h2"), etree.XPath("//h3")]
+_XP_EXP_PARENT = etree.XPath("/html/body/div[2]/div/main/section[2]/div/div/div[2]/div/div[2]")
+# lxml equivalents of the old BeautifulSoup CSS selectors — the page is now
+# parsed exactly once and every lookup runs against the same tree.
+_XP_DESC_TESTID = etree.XPath('(//*[@data-testid="description" or @data-test="description"])[1]')
+_XP_JSONLD_SCRIPTS = etree.XPath('//script[@type="application/ld+json"]')
+_XP_META_OG_DESC = etree.XPath('//meta[@property="og:description"]/@content')
+_XP_META_DESC = etree.XPath('//meta[@name="description"]/@content')
+_XP_LEVEL_TESTID = etree.XPath('(//*[@data-testid="level" or @data-test="level"])[1]')
+_XP_MODULE_H3 = etree.XPath('//*[@data-testid="module"]//h3')
+_XP_SYLLABUS_LI = etree.XPath('//*[@data-testid="syllabus"]//li')
+_XP_HTML_LANG = etree.XPath("string(/html/@lang)")
+_XP_BODY_TEXT = etree.XPath("//body//text()")
+# Fallback pairs fused into one union evaluation. Only pairs whose document
+# order matches their priority are fused: the rating fallback is a descendant
+# of the primary node, and the course-content containers sit div[4] before
+# div[5]. Pairs like offered_by (div[5] preferred over div[4]) keep the
+# two-step form because a union would invert their precedence.
+# Relative expressions evaluated against matched nodes, compiled once so the
+# evaluation context is reused instead of rebuilt per call.
+_XP_REL_LI = etree.XPath(".//li")
+_XP_DIRECT_TEXT = etree.XPath("text()")
+_XP_RATING_UNION = etree.XPath(
+    f"({XPATHS['rating_primary']} | {XPATHS['rating_fallback']})[1]")
+_XP_COURSE_CONTENT_UNION = etree.XPath(
+    f"{XPATHS['course_content_container_primary']}"
+    f" | {XPATHS['course_content_container_fallback']}")
+# num_registered failure-path probes; identical every page, so compile once.
+_PROBABLE_REG_XPATHS = [etree.XPath(x) for x in (
+    "//section[contains(., 'learners') or contains(., 'students')]",
+    "//div[contains(., 'learners') or contains(., 'students')]",
+    "//span[contains(., 'learners') or contains(., 'students')]",
+)]
+
+# --------------------------- Utilities ---------------------------
+# Hot-path patterns compiled once at import; re's internal cache is small and
+# these run per line of every page.
+_NUM_RE = re.compile(r"\b\d[\d,]*\.?\d*\b")
+_LEVEL_RE = re.compile(r"\b(Beginner|Intermediate|Advanced|All Levels)\b", re.I)
+_DUR_RE = re.compile(r"\b(week|weeks|hour|hours|hr|hrs|minute|minutes|min)\b", re.I)
+_NOISE_RE = re.compile(r"^(Explore more|Status: Preview|Preview|Learn more)$", re.I)
+_MODULES_LINE_RE = re.compile(r"^\d+\s+modules$")
+_MODULES_PHRASE_RE = re.compile(r"there are\s+\d+\s+modules")
+_TESTIMONIAL_RE = re.compile(
+    r"\bLearner since\b|Coursera allows me to learn without limits", re.I)
+_OFFERED_BY_TAIL_RE = re.compile(r"\bOffered by\b.*", re.I)
+_LEARN_MORE_RE = re.compile(r"\bLearn more\b", re.I)
+_OFFERED_BY_LEAD_RE = re.compile(r"^\s*Offered by\b", re.I)
+_DURATION_VALUE_RE = re.compile(r"\b(\d{1,3})\s*(weeks?|hours?|hrs?|minutes?|mins?)\b", re.I)
+_RATING_RE = re.compile(r"\b(\d\.\d)\b(?:\s*(?:stars?|out of 5))?", re.I)
+_TAUGHT_IN_RE = re.compile(r"^\s*Taught in\s+", re.I)
+_SENT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_VIEW_ALL_SKILLS_RE = re.compile(r"^view all skills$", re.I)
+_REG_RE = re.compile(r"\b([\d,]+)\b\s*(learners|students|enrolled)", re.I)
+# Runs against the collapsed page_text, so block boundaries show up as single
+# spaces: take a bounded span after "Offered by" and stop at the next sentence
+# mark or "Learn more" tail; extract_offered_by trims the rest.
+_OFFERED_BY_SCAN_RE = re.compile(r"Offered by\s*[:\-]?\s*(.{1,80}?)(?=\s+Learn more\b|[.•]|$)", re.I)
+_FILENAME_SAFE_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+def clean_text(t: str) -> str:
+    if not t:
+        return ""
+    # split() with no argument collapses any whitespace run in C — measurably
+    # faster than the regex for the most-called helper in the module.
+    return " ".join(t.split())
+
+_MOJIBAKE_MAP = {
+    "â€™": "’", "â€œ": "“", "â€\u009D": "”", "â€“": "–", "â€”": "—",
+    "â€¢": "•", "â€˜": "‘", "â€": "”", "Â": " ", "â€¦": "…",
+}
+# Longest-first alternation: one linear pass over the string, and the short
+# "â€" entry can no longer clobber the longer sequences it prefixes (the
+# old serial-replace chain had that ordering bug).
+_MOJIBAKE_RE = re.compile(
+    "|".join(map(re.escape, sorted(_MOJIBAKE_MAP, key=len, reverse=True))))
+
+def fix_text_encoding(s: str) -> str:
+    if not s:
+        return ""
+    return clean_text(_MOJIBAKE_RE.sub(lambda m: _MOJIBAKE_MAP[m.group(0)], s))
+
+def extract_numbers(text: str):
+    if not text:
+        return []
+    return [float(x.replace(",", "")) for x in _NUM_RE.findall(text)]
+
+def first_number(text: str):
+    nums = extract_numbers(text)
+    return nums[0] if nums else None
+
+def _first_int(text: str):
+    """First integer in the text, without materializing every match as float.
+
+    Counts (num_modules, num_registered) only ever need the leading match, so
+    this stops at the first hit instead of building extract_numbers' list.
+    """
+    m = _NUM_RE.search(text or "")
+    if not m:
+        return None
+    try:
+        return int(m.group(0).replace(",", "").split(".")[0])
+    except ValueError:
+        return None
+
+LANGUAGE_MAP = {
+    "EN": "English", "ENG": "English", "ENGLISH": "English",
+    "BM": "Malay", "MS": "Malay", "MALAY": "Malay",
+    "ZH": "Chinese", "CN": "Chinese", "CHINESE": "Chinese",
+    "ES": "Spanish", "ESP": "Spanish", "SPANISH": "Spanish",
+    "FR": "French", "FRENCH": "French",
+    "DE": "German", "GERMAN": "German",
+}
+
+@lru_cache(maxsize=4096)
+def normalize_language_full(term: str) -> str:
+    t = clean_text(term).upper()
+    if not t:
+        return ""
+    return LANGUAGE_MAP.get(t, clean_text(term))
+
+HDRS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    # Compressed transfer; each client decompresses in C. `br` only when a
+    # decoder is actually importable (see _HAS_BROTLI above).
+    "Accept-Encoding": "gzip, deflate" + (", br" if _HAS_BROTLI else ""),
+}
+
+# URLs fetched concurrently; the crawl is dominated by waiting on Coursera, so
+# overlapping requests collapses wall time to roughly total/FETCH_CONCURRENCY.
+FETCH_CONCURRENCY = 10
+# Parse workers: process_page is pure CPU (lxml + regex) and the GIL
+# serializes it in threads, so downloaded HTML is parsed in worker processes.
+PARSE_WORKERS = os.cpu_count() or 2
+
+HTTP_CACHE_PATH = "coursera_cache.sqlite"
+HTTP_CACHE_EXPIRE_SEC = 24 * 3600
+
+_FETCH_ERRORS = (requests.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+def create_session():
+    if requests_cache is not None:
+        # Cross-run cache with conditional revalidation: unchanged pages come
+        # back from SQLite (or as a body-less 304) instead of a full refetch.
+        s = requests_cache.CachedSession(
+            HTTP_CACHE_PATH,
+            cache_control=True,
+            expire_after=HTTP_CACHE_EXPIRE_SEC,
+            allowable_codes=(200,),
+        )
+    elif httpx is not None:
+        # Coursera is a single origin: HTTP/2 multiplexes every request over
+        # one TLS connection. httpx.Client is thread-safe, so the threaded
+        # fallback shares it too.
+        # Connect-level retries live in the transport; 429/5xx status
+        # retries are handled by the loop in fetch_url, since httpx has no
+        # equivalent of urllib3's status_forcelist.
+        return httpx.Client(
+            http2=True,
+            headers=HDRS,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            transport=httpx.HTTPTransport(retries=MAX_RETRIES),
+        )
+    else:
+        s = requests.Session()
+    s.headers.update(HDRS)
+    # One pooled session for the whole run: keep-alive avoids a fresh TLS
+    # handshake per URL, and urllib3's Retry replaces the hand-rolled loop
+    # that used to live in fetch_url.
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+    )
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+def _check_response_headers(url: str, headers):
+    ctype = headers.get("content-type", "")
+    if ctype and "html" not in ctype:
+        raise RuntimeError(f"Non-HTML response ({ctype}) for: {url}")
+    clen = headers.get("content-length")
+    if clen and int(clen) > MAX_RESPONSE_BYTES:
+        raise RuntimeError(f"Response too large ({clen} bytes) for: {url}")
+
+def fetch_url(session, url: str):
+    # The requests paths retry 429/5xx inside urllib3 (see create_session);
+    # httpx has no status retries of its own, so loop here when the session
+    # is an httpx.Client.
+    attempts = MAX_RETRIES if httpx is not None and isinstance(session, httpx.Client) else 1
+    for attempt in range(1, attempts + 1):
+        try:
+            resp = session.get(url, timeout=REQUEST_TIMEOUT)
+            resp.raise_for_status()
+            break
+        except _FETCH_ERRORS as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if attempt < attempts and status in (429, 500, 502, 503, 504):
+                time.sleep(attempt)
+                continue
+            raise RuntimeError(
+                f"Failed to fetch URL after {attempt} attempt(s): {url}") from e
+    _check_response_headers(url, resp.headers)
+    if len(resp.content) > MAX_RESPONSE_BYTES:
+        raise RuntimeError(f"Response too large ({len(resp.content)} bytes) for: {url}")
+    if hasattr(resp, "apparent_encoding") and (
+            not resp.encoding or resp.encoding.lower() == "iso-8859-1"):
+        resp.encoding = resp.apparent_encoding or "utf-8"
+    return resp
+
+def load_urls(file_path: str):
+    """Yield URLs from the list file, streaming and deduplicating as it goes.
+
+    Duplicates are detected on a normalized key (lowercased host, fragment
+    stripped) so the same course listed twice is only fetched once.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"URLs file not found: {file_path}")
+    seen = set()
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if not url or url.startswith("#"):
+                continue
+            parts = urlsplit(url)
+            key = (parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield url
+
+# --------------------------- Filters ---------------------------
+def is_level(s: str) -> bool:
+    return bool(_LEVEL_RE.search(s or ""))
+
+def is_duration(s: str) -> bool:
+    return bool(_DUR_RE.search(s or ""))
+
+def is_noise(line: str) -> bool:
+    if not line:
+        return True
+    l = line.strip()
+    return bool(_NOISE_RE.search(l))
+
+def is_modules_line(line: str) -> bool:
+    if not line:
+        return False
+    l = line.strip().lower()
+    return bool(_MODULES_LINE_RE.search(l)) or bool(_MODULES_PHRASE_RE.search(l))
+
+MARKETING_PHRASES = [
+    r"Build your subject-matter expertise",
+    r"This course is part of the .* Specialization",
+    r"When you enroll in this course, you'll also be enrolled",
+    r"Learn new concepts from industry experts",
+    r"Gain a foundational understanding",
+    r"Develop job-relevant skills",
+    r"Earn a shareable career certificate",
+]
+# Single alternation: one regex pass per line instead of seven.
+_MARKETING_RE = re.compile("|".join(f"(?:{p})" for p in MARKETING_PHRASES), re.I)
+
+def is_marketing(line: str) -> bool:
+    if not line:
+        return False
+    return bool(_MARKETING_RE.search(line.strip()))
+
+def is_testimonial(line: str) -> bool:
+    if not line:
+        return False
+    l = line.strip()
+    return bool(_TESTIMONIAL_RE.search(l))
+
+# --------------------------- XPath helpers ---------------------------
+def xp_text(doc, key: str) -> str:
+    try:
+        nodes = COMPILED[key](doc)
+        if not nodes:
+            return ""
+        n = nodes[0]
+        txt = n if isinstance(n, str) else n.text_content()
+        return clean_text(txt)
+    except Exception:
+        return ""
+
+def xp_norm(doc, key: str) -> str:
+    try:
+        return clean_text(COMPILED_NS[key](doc))
+    except Exception:
+        return ""
+
+# --------------------------- NEW: offered_by cleaner ---------------------------
+@lru_cache(maxsize=4096)
+def extract_offered_by(raw: str) -> str:
+    """
+    Normalize the 'offered_by' institution string:
+    - Remove 'Offered by'/'Learn more'
+    - Cut trailing marketing ('has', 'is')
+    - Keep first entity-like chunk
+    - Map known short forms
+    """
+    t = clean_text(raw)
+    if not t:
+        return ""
+    # Remove 'Offered by' and 'Learn more'
+    t = _OFFERED_BY_TAIL_RE.sub("", t)
+    t = _LEARN_MORE_RE.sub("", t)
+    # Keep first chunk (split by dot/bullet/newline)
+    t = re.split(r"[\.•\n]+", t)[0].strip()
+    # Cut at ' has ' / ' is ' to drop marketing blurbs
+    t = re.split(r"\s+(has|is)\s+", t)[0].strip()
+    SHORT_MAP = {"CalArts": "California Institute of the Arts", "MoMA": "The Museum of Modern Art"}
+    return SHORT_MAP.get(t, t)
+
+# --------------------------- Description extraction (hardened) ---------------------------
+def extract_description(doc):
+    raw_source = {}
+
+    # The container, heading, JSON-LD and meta sources frequently carry the
+    # same body text; classify each distinct input once and drop duplicate
+    # cleaned outputs so scoring only sees unique candidates.
+    _filtered = {}
+
+    def filter_lines(text):
+        cached = _filtered.get(text)
+        if cached is not None:
+            return cached
+        cleaned = []
+        for p in _SENT_RE.split(text):
+            if not p:
+                continue
+            # drop meta-style opener "Offered by ...", marketing and testimonials
+            if _OFFERED_BY_LEAD_RE.match(p) or is_marketing(p) or is_testimonial(p):
+                continue
+            cleaned.append(p)
+        out = clean_text(" ".join(cleaned))
+        _filtered[text] = out
+        return out
+
+    candidates = []
+    seen = set()
+
+    def add_candidate(key, filtered):
+        if filtered not in seen:
+            seen.add(filtered)
+            candidates.append((key, filtered))
+
+    # 1) containers (prefer div[4], then div[5])
+    for label, key in ("div4", "description_container_primary"), ("div5", "description_container_fallback"):
+        try:
+            nodes = COMPILED[key](doc)
+            if nodes:
+                txt = clean_text(nodes[0].text_content())
+                filtered = filter_lines(txt)
+                if filtered:
+                    add_candidate("container_" + label, filtered)
+                raw_source["container_" + label] = filtered
+        except Exception:
+            pass
+
+    # 2) look for headings indicating canonical description
+    heading_labels = [
+        "About this Course", "About the Course", "Course description",
+        "What you'll learn", "Overview"
+    ]
+    for hxp in HEADING_XPATHS:
+        try:
+            for h in hxp(doc):
+                ht = clean_text(h.text_content())
+                if any(ht.lower() == hl.lower() for hl in heading_labels):
+                    block = h.getparent()
+                    if block is not None:
+                        txt = clean_text(block.text_content())
+                        filtered = filter_lines(txt)
+                        if filtered:
+                            key = "heading_" + ht
+                            add_candidate(key, filtered)
+                            raw_source[key] = filtered
+        except Exception:
+            pass
+
+    # 3) data-testid description
+    try:
+        block = _XP_DESC_TESTID(doc)
+        if block:
+            txt = clean_text(block[0].text_content())
+            filtered = filter_lines(txt)
+            if filtered:
+                add_candidate("css_data_testid", filtered)
+                raw_source["css_data_testid"] = filtered
+    except Exception:
+        pass
+
+    # 4) JSON-LD description
+    try:
+        for sc in _XP_JSONLD_SCRIPTS(doc):
+            try:
+                data = _json_loads(sc.text or "{}")
+            except Exception:
+                continue
+            nodes = data if isinstance(data, list) else [data]
+            for obj in nodes:
+                if isinstance(obj, dict) and (obj.get("@type") in ("Course", "CreativeWork", None)):
+                    desc = obj.get("description") or obj.get("about")
+                    if isinstance(desc, str) and clean_text(desc):
+                        txt = clean_text(desc)
+                        filtered = filter_lines(txt)
+                        if filtered:
+                            add_candidate("json_ld", filtered)
+                            raw_source["json_ld"] = filtered
+    except Exception:
+        pass
+
+    # 5) meta tags
+    for meta_xp, key in (_XP_META_OG_DESC, "og:description"), (_XP_META_DESC, "meta:description"):
+        try:
+            contents = meta_xp(doc)
+            if contents:
+                txt = clean_text(contents[0])
+                filtered = filter_lines(txt)
+                if filtered:
+                    add_candidate(key, filtered)
+                    raw_source[key] = filtered
+        except Exception:
+            pass
+
+    if not candidates:
+        return "", "", raw_source
+
+    # Choose best candidate by score: non-marketing length minus marketing
+    # penalty, counted with one automaton pass over the candidate.
+    def score(text):
+        return len(text) - 100 * len(_MARKETING_RE.findall(text))
+
+    best = max(candidates, key=lambda c: score(c[1]))
+    return best[1], best[0], raw_source
+
+# --------------------------- Duration fallback (NEW, compact) ---------------------------
+def extract_duration_from_page(page_text: str) -> str:
+    """
+    Scan the page's flattened text for a simple duration phrase like '4 weeks',
+    '20 hours', etc. Returns a cleaned phrase or '' if not found.
+    """
+    m = _DURATION_VALUE_RE.search(page_text)
+    if m:
+        qty = m.group(1)
+        unit = m.group(2)
+        # normalize unit pluralization
+        unit_norm = unit.lower()
+        if unit_norm.startswith("hr"):
+            unit_norm = "hours" if qty != "1" else "hour"
+        elif unit_norm.startswith("min"):
+            unit_norm = "minutes" if qty != "1" else "minute"
+        elif unit_norm.startswith("week"):
+            unit_norm = "weeks" if qty != "1" else "week"
+        elif unit_norm.startswith("hour"):
+            unit_norm = "hours" if qty != "1" else "hour"
+        elif unit_norm.startswith("minute"):
+            unit_norm = "minutes" if qty != "1" else "minute"
+        return f"{qty} {unit_norm}"
+    return ""
+
+# --------------------------- Extractor ---------------------------
+def extract_from_doc(doc, url: str) -> list:
+    # Flatten the document text once; every full-text fallback below reuses it
+    # instead of re-walking the DOM.
+    page_text = clean_text(" ".join(_XP_BODY_TEXT(doc)))
+    raw_debug = {}
+
+    # Title
+    title = xp_text(doc, "title_h1") or xp_text(doc, "title_h2") or xp_text(doc, "title_tag")
+
+    # Category/Subcategory
+    course_category = xp_norm(doc, "course_category")
+    course_subcategory = xp_norm(doc, "course_subcategory")
+    if DEBUG:
+        raw_debug["course_category_raw"] = course_category
+        raw_debug["course_subcategory_raw"] = course_subcategory
+
+    # Rating (with guard to avoid durations)
+    rating_nodes = _XP_RATING_UNION(doc)
+    rating_txt = clean_text(rating_nodes[0].text_content()) if rating_nodes else ""
+    rating_val = None
+    if rating_txt and not is_duration(rating_txt):
+        # Look for patterns typical of ratings, e.g., "4.8", "4.8 stars", "4.8 out of 5"
+        m = _RATING_RE.search(rating_txt)
+        if m:
+            try:
+                rating_val = float(m.group(1))
+            except Exception:
+                rating_val = None
+        else:
+            # fallback to first number only if it does NOT look like weeks/hours
+            if not _DUR_RE.search(rating_txt):
+                rating_val = first_number(rating_txt)
+    rating = rating_val if isinstance(rating_val, (int, float)) else "N/A"
+    if DEBUG:
+        raw_debug["rating_raw"] = rating_txt
+
+    # Language: the html@lang probe is only evaluated when the primary XPath
+    # comes up empty (or short-circuits it on the common path).
+    language_raw = xp_text(doc, "language") or _XP_HTML_LANG(doc)
+    # Strip "Taught in " prefix if present
+    if language_raw:
+        language_raw = _TAUGHT_IN_RE.sub("", language_raw, count=1).strip()
+    language = normalize_language_full(language_raw) if language_raw else "N/A"
+    if DEBUG:
+        raw_debug["language_raw"] = language_raw
+
+    # -------------------- Time to complete (ONLY CHANGE) --------------------
+    # Prefer explicit duration via primary XPath;
+    # else use fallback XPath;
+    # else default to "Flexible schedule".
+    time_txt_primary = xp_text(doc, "time_primary")
+    time_txt = None
+    if is_duration(time_txt_primary):
+        time_txt = time_txt_primary
+    else:
+        time_txt_fallback = xp_text(doc, "time_flexible")
+        time_txt = time_txt_fallback if is_duration(time_txt_fallback) else (time_txt_fallback or "Flexible schedule")
+
+    time_to_complete = clean_text(time_txt) if time_txt else "Flexible schedule"
+    if DEBUG:
+        raw_debug["time_primary_raw"] = time_txt_primary
+        raw_debug["time_flexible_raw"] = xp_text(doc, "time_flexible")
+    # -----------------------------------------------------------------------
+
+    # experience_required
+    exp_candidate = time_txt_primary
+    experience_required = clean_text(exp_candidate) if is_level(exp_candidate) else ""
+    if not experience_required:
+        tags = _XP_LEVEL_TESTID(doc)
+        if tags and is_level(tags[0].text_content()):
+            experience_required = clean_text(tags[0].text_content())
+    if not experience_required:
+        try:
+            parent_nodes = _XP_EXP_PARENT(doc)
+            if parent_nodes:
+                txt_block = clean_text(parent_nodes[0].text_content())
+                m = _LEVEL_RE.search(txt_block)
+                if m:
+                    experience_required = m.group(0)
+        except Exception:
+            pass
+    if not experience_required:
+        experience_required = "N/A"
+    if DEBUG:
+        raw_debug["experience_required_raw"] = exp_candidate
+
+    # num_modules (span → fallback → anchor count → module headings)
+    num_modules_span_primary = xp_text(doc, "num_modules_span_primary")
+    num_modules_span_fallback = xp_text(doc, "num_modules_span_fallback") if not num_modules_span_primary else ""
+    num_modules_txt = num_modules_span_primary or num_modules_span_fallback
+    num_modules_val = _first_int(num_modules_txt)
+
+    num_modules_anchor_count = 0
+    if num_modules_val is None:
+        try:
+            anchor_nodes = COMPILED["num_modules_anchor_container"](doc)
+            num_modules_anchor_count = len(anchor_nodes)
+            if num_modules_anchor_count > 0:
+                num_modules_val = float(num_modules_anchor_count)
+        except Exception:
+            pass
+
+    if num_modules_val is None:
+        mod_headings = _XP_MODULE_H3(doc)
+        num_modules_val = len(mod_headings) if mod_headings else None
+
+    num_modules = int(num_modules_val) if isinstance(num_modules_val, (int, float)) else "N/A"
+    if DEBUG:
+        raw_debug["num_modules_span_primary_raw"] = num_modules_span_primary
+        raw_debug["num_modules_span_fallback_raw"] = num_modules_span_fallback
+        raw_debug["num_modules_anchor_count"] = num_modules_anchor_count
+
+    # skill_acquire
+    skill_items = []
+    for key in ("skill_acquire_ul_primary", "skill_acquire_ul_fallback"):
+        try:
+            ul_nodes = COMPILED[key](doc)
+            if ul_nodes:
+                for ul in ul_nodes:
+                    for li in _XP_REL_LI(ul):
+                        txt_li = clean_text(li.text_content())
+                        if txt_li and not _VIEW_ALL_SKILLS_RE.search(txt_li):
+                            skill_items.append(txt_li)
+                break
+        except Exception:
+            continue
+    skill_acquire = "; ".join(skill_items) if skill_items else "N/A"
+    if DEBUG:
+        raw_debug["skill_ul_count"] = len(skill_items)
+
+    # description (robust extractor)
+    description_txt, desc_source, desc_sources_raw = extract_description(doc)
+    description = fix_text_encoding(description_txt) if description_txt else "N/A"
+    if DEBUG:
+        raw_debug.update({f"description_source": desc_source, **{f"desc_src_{k}": v for k, v in desc_sources_raw.items()}})
+
+    # --- num_registered with multiple fallbacks ---
+    reg_txt = xp_text(doc, "num_registered") or xp_text(doc, "num_registered_fallback_instructor")
+    reg_val = _first_int(reg_txt)
+    if reg_val is None:
+        for xp in _PROBABLE_REG_XPATHS:
+            try:
+                nodes = xp(doc)
+                for n in nodes:
+                    txt = clean_text(n.text_content())
+                    m = _REG_RE.search(txt)
+                    if m:
+                        reg_val = float(m.group(1).replace(",", ""))
+                        break
+                if reg_val is not None:
+                    break
+            except Exception:
+                continue
+    if reg_val is None:
+        m = _REG_RE.search(page_text)
+        if m:
+            try:
+                reg_val = float(m.group(1).replace(",", ""))
+            except Exception:
+                reg_val = None
+    num_registered = int(reg_val) if isinstance(reg_val, (int, float)) else "N/A"
+    if DEBUG:
+        raw_debug["num_registered_raw"] = reg_txt
+
+    # course content (prefer div[4], then div[5], then fallbacks); one union
+    # evaluation yields both containers in document (= priority) order.
+    course_content_txt = ""
+    for container in _XP_COURSE_CONTENT_UNION(doc):
+        try:
+            # One pre-order walk over the subtree; classify tags in Python
+            # instead of three separate .// traversals.
+            collected = []
+            for el in container.iter("h2", "h3", "li", "p"):
+                t = clean_text(el.text_content())
+                if t and not is_noise(t) and not is_modules_line(t):
+                    collected.append((el.tag, t))
+            parts = [t for tag, t in collected if tag in ("h2", "h3")]
+            parts += [t for tag, t in collected if tag == "li"]
+            if not parts:
+                parts = [t for tag, t in collected if tag == "p"]
+            course_content_txt = "\n".join(parts) if parts else clean_text(container.text_content())
+            course_content_txt = "\n".join([
+                l for l in course_content_txt.splitlines()
+                if l.strip() and not is_noise(l) and not is_modules_line(l)
+            ])
+            if course_content_txt:
+                break
+        except Exception:
+            continue
+
+    # Fallbacks only if the strict containers were empty
+    if not course_content_txt:
+        parts_fb = []
+        try:
+            anchor_nodes = COMPILED["num_modules_anchor_container"](doc)
+            for a in anchor_nodes:
+                atxt = clean_text(a.text_content())
+                if atxt and not is_noise(atxt) and not is_modules_line(atxt):
+                    parts_fb.append(atxt)
+        except Exception:
+            pass
+        for h in _XP_MODULE_H3(doc):
+            ht = clean_text(h.text_content())
+            if ht and not is_noise(ht) and not is_modules_line(ht):
+                parts_fb.append(ht)
+        for li in _XP_SYLLABUS_LI(doc):
+            lt = clean_text(li.text_content())
+            if lt and not is_noise(lt) and not is_modules_line(lt):
+                parts_fb.append(lt)
+        if parts_fb:
+            course_content_txt = "\n".join(parts_fb)
+
+    course_content = course_content_txt if course_content_txt else "N/A"
+    if DEBUG:
+        raw_debug["course_content_raw"] = course_content_txt
+
+    # offered_by: primary → alt → text fallback ("Offered by …") → clean
+    offered_by_raw = ""
+    try:
+        nodes = COMPILED["offered_by_primary"](doc)
+        if nodes:
+            direct_texts = _XP_DIRECT_TEXT(nodes[0])
+            offered_by_raw = clean_text(" ".join(direct_texts))
+        if not offered_by_raw:
+            nodes_alt = COMPILED["offered_by_alt"](doc)
+            if nodes_alt:
+                direct_texts_alt = _XP_DIRECT_TEXT(nodes_alt[0])
+                offered_by_raw = clean_text(" ".join(direct_texts_alt))
+    except Exception:
+        offered_by_raw = ""
+
+    offered_by_fallback_text = ""
+    if not offered_by_raw:
+        m = _OFFERED_BY_SCAN_RE.search(page_text)
+        if m:
+            offered_by_fallback_text = clean_text(m.group(1))
+            offered_by_raw = offered_by_fallback_text
+
+    offered_by = extract_offered_by(offered_by_raw) if offered_by_raw else "Coursera"
+    if DEBUG:
+        raw_debug["offered_by_raw_primary"] = offered_by_raw
+        raw_debug["offered_by_fallback_text"] = offered_by_fallback_text
+
+    # Row is built directly in COLUMNS order; the Sheets writer consumes it
+    # as-is with no per-cell dict lookups. Use row_as_dict for keyed access.
+    row = [
+        url,
+        title if title else "N/A",
+        course_category if course_category else "N/A",
+        course_subcategory if course_subcategory else "N/A",
+        rating,
+        language,
+        time_to_complete,
+        num_modules,
+        skill_acquire,
+        description,
+        experience_required,
+        num_registered,
+        course_content,
+        offered_by,
+    ]
+
+    if DEBUG:
+        debug_print_focus(url, row_as_dict(row), raw_debug)
+    return row
+
+def row_as_dict(row: list) -> dict:
+    """Keyed view of a COLUMNS-ordered row, for debug output only."""
+    return dict(zip(COLUMNS, row))
+
+# --------------------------- Google Sheets I/O ---------------------------
+# The service-account token exchange is a network round-trip (~300 ms) on
+# every invocation; cache the bearer token across runs and reuse it until it
+# is within a few minutes of expiry.
+_TOKEN_CACHE_PATH = pathlib.Path.home() / ".gsheets_token.json"
+
+def _load_cached_token(creds):
+    try:
+        cached = _json_loads(_TOKEN_CACHE_PATH.read_bytes())
+        expiry = datetime.datetime.fromisoformat(cached["expiry"])
+        if expiry - datetime.datetime.utcnow() > datetime.timedelta(minutes=5):
+            creds.token = cached["token"]
+            creds.expiry = expiry
+    except Exception:
+        pass  # cache is best-effort; a fresh exchange happens anyway
+
+def _store_cached_token(creds):
+    try:
+        if creds.token and creds.expiry:
+            payload = json.dumps(
+                {"token": creds.token, "expiry": creds.expiry.isoformat()})
+            # This is a live bearer token with Sheets+Drive scope: create the
+            # file owner-readable only (and fix up caches left by older runs).
+            fd = os.open(_TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(payload)
+            os.chmod(_TOKEN_CACHE_PATH, 0o600)
+    except Exception:
+        pass
+
+def get_gsheet_client():
+    if not ENABLE_SHEETS:
+        return None
+    if gspread is None or Credentials is None:
+        raise RuntimeError("gspread/google-auth not installed. Set ENABLE_SHEETS=False to skip.")
+    scopes = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive",
+    ]
+    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT_JSON, scopes=scopes)
+    _load_cached_token(creds)
+    client = gspread.authorize(creds)
+    if not creds.valid:
+        creds.refresh(_GoogleAuthRequest())
+    _store_cached_token(creds)
+    return client
+
+def ensure_sheet_and_header(client):
+    if not client:
+        return None, None
+    sh = client.open_by_url(SPREADSHEET_URL)
+    try:
+        ws = sh.worksheet(WORKSHEET_NAME)
+    except Exception:
+        ws = sh.add_worksheet(title=WORKSHEET_NAME, rows=2000, cols=len(COLUMNS))
+    header = ws.row_values(1)
+    if header != COLUMNS:
+        ws.update("A1", [COLUMNS])
+    return sh, ws
+
+_NA = "N/A"
+
+def append_rows(ws, rows: list):
+    if not ws or not rows:
+        return
+    # Rows already arrive as lists in COLUMNS order, so this is a flat
+    # comprehension with no per-cell dict lookups — just the empty-value
+    # sentinel substitution.
+    values = [[_NA if v is None or v == "" else v for v in r] for r in rows]
+    # Hit the spreadsheets.values.append endpoint directly (one HTTP call per
+    # flush, no per-row wrapping) with exponential backoff on quota 429s.
+    body = {"values": values}
+    params = {"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"}
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            ws.spreadsheet.values_append(f"'{WORKSHEET_NAME}'!A1", params=params, body=body)
+            return
+        except gspread.exceptions.APIError:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(2 ** attempt)
+
+def start_sheets_writer(ws):
+    """Run Sheets appends on a background thread so scraping never waits on
+    Google I/O. Returns (queue, thread); enqueue lists of rows, then None as a
+    shutdown sentinel. append_rows already backs off exponentially on 429s."""
+    q = queue.Queue(maxsize=10)
+
+    def run():
+        while True:
+            rows = q.get()
+            if rows is None:
+                q.task_done()
+                break
+            try:
+                append_rows(ws, rows)
+            except Exception as e:
+                print(f"[WARN] Sheets append failed: {e}")
+            finally:
+                q.task_done()
+
+    t = threading.Thread(target=run, name="sheets-writer", daemon=True)
+    t.start()
+    return q, t
+
+# Static debug-page shell built once at import; only the truly dynamic parts
+# are substituted per URL. string.Template keeps the raw CSS braces literal.
+_DEBUG_PAGE_TMPL = Template("""<!DOCTYPE html>
+<html lang='en'>
+<head><meta charset='utf-8' /><title>Coursera Debug — $url</title>
+<style>
+body { margin:0; font-family: system-ui, -apple-system, Segoe UI, Roboto, Ubuntu, sans-serif; }
+header { position: sticky; top: 0; background: #0f172a; color: #fff; padding: 10px 16px; z-index: 9999; }
+header h1 { font-size: 16px; margin: 0; }
+.container { display: grid; grid-template-columns: 420px 1fr; min-height: 100vh; }
+.sidebar { padding: 12px 16px; border-right: 1px solid #e2e8f0; overflow: auto; max-height: calc(100vh - 48px); }
+.main { height: calc(100vh - 48px); }
+iframe { width: 100%; height: 100%; border: 0; background: #fff; }
+.swatch { display:inline-block; width:14px; height:14px; border-radius:2px; margin-right:6px; vertical-align:middle; }
+.sidebar h2 { font-size:15px; margin:16px 0 8px; color:#0f172a; }
+.sidebar table { width:100%; border-collapse:collapse; font-size:13px; }
+.sidebar th { text-align:left; width:160px; color:#334155; vertical-align:top; padding:6px 4px; border-bottom:1px solid #e2e8f0; }
+.sidebar td { padding:6px 4px; border-bottom:1px solid #e2e8f0; }
+.preview-block summary { cursor:pointer; font-weight:600; }
+.preview { background:#f8fafc; margin:4px 0; padding:6px 8px; border-radius:4px; }
+.preview-xp { color:#64748b; font-size:12px; margin-bottom:4px; }
+.preview-txt { white-space: pre-wrap; font-size:13px; }
+footer { font-size:12px; color:#64748b; padding:8px 16px; border-top:1px solid #e2e8f0; }
+</style></head>
+<body>
+<header><h1>Debugging extraction for: $url</h1></header>
+<div class='container'>
+  <aside class='sidebar'>
+    <h2>Extracted summary</h2>
+    <table>$summary</table>
+    <h2>XPath legend</h2>
+    <ul>$legend</ul>
+    <h2>Matched text previews</h2>
+    $previews
+  </aside>
+  <main class='main'>
+    <iframe src="$frame"></iframe>
+  </main>
+</div>
+<footer>
+ This debug page outlines nodes matched by your XPaths (dashed boxes). If counts are 0, the absolute XPath likely does not exist for this course variation.
+</footer>
+</body></html>""")
+
+# --------------------------- Debug HTML helper ---------------------------
+# Single-pass HTML escaping: html.escape chains five str.replace scans, while
+# str.translate does one walk with a prebuilt table.
+_HTML_ESC = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+def _esc(s: str) -> str:
+    return str(s).translate(_HTML_ESC)
+
+HIGHLIGHT_COLORS = ["#e53935", "#8e24aa", "#3949ab", "#1e88e5", "#00897b",
+                    "#7cb342", "#fdd835", "#fb8c00", "#6d4c41", "#546e7a"]
+# One outline string per color, rendered once at import.
+_OUTLINE_STYLES = {
+    c: f"outline: 3px dashed {c}; outline-offset: 2px;" for c in HIGHLIGHT_COLORS}
+
+# Overlays drawn on the debug report: label -> compiled XPath. Reuses the
+# COMPILED entries so the expressions are parsed once at import, not per page.
+DEBUG_XPATHS = {
+    "course_content (div[4])": COMPILED["course_content_container_primary"],
+    "course_content (div[5])": COMPILED["course_content_container_fallback"],
+    "description (div[4])": COMPILED["description_container_primary"],
+    "description (div[5])": COMPILED["description_container_fallback"],
+    "num_registered (primary)": COMPILED["num_registered"],
+    "num_registered (instructor fallback)": COMPILED["num_registered_fallback_instructor"],
+}
+
+def _wrap_node_with_style(node, color, label):
+    if not isinstance(node, etree._Element):
+        return
+    outline = _OUTLINE_STYLES[color]
+    existing = node.get("style")
+    # Matched containers rarely carry a style attribute; skip the concat on
+    # the common path.
+    node.set("style", outline if not existing else existing + "; " + outline)
+    node.set("data-debug-label", label)
+
+def _find_nodes(doc, xp):
+    try:
+        return xp(doc)
+    except Exception:
+        return []
+
+def _collect_text_preview(node, max_len=800):
+    try:
+        txt = node.text_content()
+    except Exception:
+        txt = ""
+    # C-level whitespace split + join; cheaper than a regex sub per node.
+    txt = " ".join(txt.split())
+    return (txt[:max_len] + "…") if len(txt) > max_len else txt
+
+def highlight_html_with_xpaths(doc, xpaths_dict):
+    # Mutates the given tree in place (outline styles + labels); callers hand
+    # over a tree they are done extracting from rather than reparsing the text.
+    # Match metadata comes back as parallel lists (label/color/xpath/count/
+    # previews) so the render loops zip over them instead of chasing dicts.
+    labels, colors, xpaths, counts, previews_per_label = [], [], [], [], []
+    mutated = False
+    for i, (label, xp) in enumerate(xpaths_dict.items()):
+        color = HIGHLIGHT_COLORS[i % len(HIGHLIGHT_COLORS)]
+        nodes = _find_nodes(doc, xp)
+        previews = []
+        for n in nodes:
+            _wrap_node_with_style(n, color, label)
+            previews.append(_collect_text_preview(n))
+        if nodes:
+            mutated = True
+        labels.append(label)
+        colors.append(color)
+        xpaths.append(xp.path)
+        counts.append(len(nodes))
+        previews_per_label.append(previews)
+    # Re-serializing the full document is the expensive part; skip it when no
+    # XPath hit anything. UTF-8 bytes go straight to disk with no str detour.
+    modified_html = etree.tostring(doc, encoding="utf-8", method="html") if mutated else None
+    return modified_html, labels, colors, xpaths, counts, previews_per_label
+
+def _summary_table(row):
+    tr_rows = []
+    for h in COLUMNS:
+        tr_rows.append(f"<tr><th>{_esc(h)}</th><td>{_esc(row.get(h, ''))}</td></tr>")
+    return "\n".join(tr_rows)
+
+def save_debug_html(url, doc, row, xpaths_dict, out_path):
+    modified_html, labels, colors, xpaths, counts, previews_per_label = \
+        highlight_html_with_xpaths(doc, xpaths_dict)
+    if modified_html is None:
+        # Nothing matched, nothing was outlined — serialize once, unstyled.
+        modified_html = etree.tostring(doc, encoding="utf-8", method="html")
+
+    legend_items = []
+    for label, color, xp, count in zip(labels, colors, xpaths, counts):
+        legend_items.append(
+            f"<li><span class='swatch' style='background:{color}'></span>"
+            f"<strong>{_esc(label)}</strong> — <code>{_esc(xp)}</code> • hits: <strong>{count}</strong></li>"
+        )
+    legend_html = "\n".join(legend_items)
+
+    # BUGFIX: the group append used to sit outside this loop, so only the last
+    # label's previews made it into the report. Accumulate every group in a
+    # flat chunk list and join once at the end.
+    preview_parts = []
+    for label, color, xp, items in zip(labels, colors, xpaths, previews_per_label):
+        xp = _esc(xp)
+        body = "".join(
+            f"<li><div class='preview' style='border-left:6px solid {color}'>"
+            f"<div class='preview-xp'><code>{xp}</code></div>"
+            f"<div class='preview-txt'>{_esc(p)}</div>"
+            f"</div></li>" for p in items
+        )
+        preview_parts.append(
+            f"<details class='preview-block' open><summary><span class='swatch' style='background:{color}'></span>"
+            f"{_esc(label)} ({len(items)} matches)</summary><ul>{body}</ul></details>"
+        )
+    previews_html = "".join(preview_parts)
+
+    # The highlighted page goes to a sibling file referenced by the iframe;
+    # escaping a full page into srcdoc scanned megabytes per URL for nothing.
+    frame_path = out_path.with_suffix(".frame.html")
+
+    out = _DEBUG_PAGE_TMPL.substitute(
+        url=_esc(url),
+        summary=_summary_table(row),
+        legend=legend_html,
+        previews=previews_html,
+        frame=_esc(frame_path.name),
+    )
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    # Encode once and write bytes, rather than encoding incrementally through
+    # a text-mode wrapper.
+    with open(frame_path, "wb") as f:
+        f.write(modified_html)
+    with open(out_path, "wb") as f:
+        f.write(out.encode("utf-8"))
+    return str(out_path)
+
+# --------------------------- Printing ---------------------------
+def debug_print_focus(url: str, row: dict, raw_debug: dict):
+    print("\n================ XPATH DEBUG ================")
+    print(f"course_url : {url}")
+    print(f"title : {row.get('title')}")
+    print(f"course_category : {row.get('course_category')}")
+    print(f"course_subcategory: {row.get('course_subcategory')}")
+    print(f"rating : {row.get('rating')}")
+    print(f"language : {row.get('language')}")
+    print(f"Time to complete : {row.get('Time to complete')}")
+    print(f"num_modules : {row.get('num_modules')}")
+    print(f"skill_acquire : {row.get('skill_acquire')}")
+    print(f"description : {row.get('description')[:800]}")
+    print(f"experience_required: {row.get('experience_required')}")
+    print(f"num_registered : {row.get('num_registered')}")
+    print(f"course content : {row.get('course content')[:400]}")
+    print(f"offered_by : {row.get('offered_by')}")
+    print("---- RAW MATCHES ----")
+    for k, v in raw_debug.items():
+        pv = v if isinstance(v, str) else str(v)
+        print(f"{k:<30}: {pv[:400]}")
+    print("============================================\n")
+
+# --------------------------- Main ---------------------------
+# ASCII translation table mapping every character outside [A-Za-z0-9._-] to
+# "_"; characters above 127 fall through and are handled by the regex guard.
+_SANITIZE_TABLE = str.maketrans({
+    c: "_" for c in map(chr, range(128))
+    if not (c.isascii() and (c.isalnum() or c in "._-"))})
+
+def sanitize_filename(s: str) -> str:
+    s = s.translate(_SANITIZE_TABLE)
+    if not s.isascii():
+        s = _FILENAME_SAFE_RE.sub("_", s)
+    return s[:100]
+
+def _html_cache_path(url: str) -> pathlib.Path:
+    return HTML_CACHE_DIR / (hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html")
+
+def _html_cache_get(url: str):
+    if REFRESH:
+        return None
+    path = _html_cache_path(url)
+    try:
+        return path.read_bytes() if path.exists() else None
+    except OSError:
+        return None
+
+def _html_cache_put(url: str, html_bytes: bytes):
+    try:
+        HTML_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _html_cache_path(url).write_bytes(html_bytes)
+    except OSError:
+        pass  # cache is best-effort; never fail the crawl over it
+
+# Per-host politeness: consecutive hits on one host stay REQUEST_DELAY_SEC
+# apart, while different hosts proceed independently at full speed.
+_LAST_HIT = {}
+_LAST_HIT_LOCK = threading.Lock()
+
+def _reserve_host_slot(url: str) -> float:
+    """Reserve the next polite fetch slot for url's host.
+
+    Returns how long the caller must sleep before starting; concurrent
+    callers for the same host queue up REQUEST_DELAY_SEC apart because each
+    reservation advances _LAST_HIT before anyone sleeps.
+    """
+    host = urlsplit(url).netloc.lower()
+    with _LAST_HIT_LOCK:
+        now = time.monotonic()
+        start = max(now, _LAST_HIT.get(host, 0.0) + REQUEST_DELAY_SEC)
+        _LAST_HIT[host] = start
+        return start - now
+
+async def fetch_async(session, url: str) -> bytes:
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        _check_response_headers(url, resp.headers)
+        data = await resp.read()
+        if len(data) > MAX_RESPONSE_BYTES:
+            raise RuntimeError(f"Response too large ({len(data)} bytes) for: {url}")
+        return data
+
+async def fetch_async_with_retries(session, url: str) -> bytes:
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            return await fetch_async(session, url)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            await asyncio.sleep(REQUEST_DELAY_SEC * attempt)
+    raise RuntimeError(f"Failed to fetch URL after {MAX_RETRIES} attempts: {url}")
+
+def process_page(i, url, html_bytes: bytes) -> list:
+    """Per-URL CPU work, kept top-level so it pickles into the process pool.
+
+    Parses the bytes once and extracts the row; in debug mode the same tree
+    is reused for the highlighted debug page (raw + debug files are written
+    by the worker itself), so nothing is ever parsed twice.
+    """
+    doc = etree.fromstring(html_bytes, _HTML_PARSER)
+    row = extract_from_doc(doc, url)
+    if DEBUG:
+        raw_name = sanitize_filename(f"{i:03d}_raw.html")
+        with open(DEBUG_OUTPUT_DIR / raw_name, "wb") as f:
+            f.write(html_bytes)
+        dbg_name = sanitize_filename(f"{i:03d}_debug.html")
+        save_debug_html(url, doc, row_as_dict(row), DEBUG_XPATHS, DEBUG_OUTPUT_DIR / dbg_name)
+    return row
+
+async def crawl_async(urls):
+    """
+    Fetch every URL concurrently (bounded by FETCH_CONCURRENCY) and hand the
+    HTML to a process pool so lxml parsing runs on all cores and overlaps
+    with further fetches. Returns (index, url, row_or_exception) per URL in
+    input order; page bytes stay inside the workers so the parent never
+    accumulates a run's worth of HTML.
+    """
+    sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    loop = asyncio.get_running_loop()
+    # Raw HTML strings cross the process boundary, never parsed trees; each
+    # worker rebuilds the compiled XPaths once at import.
+    with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as pool:
+        async with aiohttp.ClientSession(headers=HDRS, timeout=timeout) as session:
+            async def bound(i, url):
+                try:
+                    html_bytes = _html_cache_get(url)
+                    if html_bytes is None:
+                        async with sem:
+                            wait = _reserve_host_slot(url)
+                            if wait > 0:
+                                await asyncio.sleep(wait)
+                            print(f"[{i}/{len(urls)}] Fetching: {url}")
+                            html_bytes = await fetch_async_with_retries(session, url)
+                        _html_cache_put(url, html_bytes)
+                    else:
+                        print(f"[{i}/{len(urls)}] Cached: {url}")
+                    row = await loop.run_in_executor(
+                        pool, process_page, i, url, html_bytes)
+                    return i, url, row
+                except Exception as e:
+                    return i, url, e
+
+            return await asyncio.gather(*(bound(i, u) for i, u in enumerate(urls, start=1)))
+
+def crawl_threaded(urls):
+    """Thread-pool fallback for environments without aiohttp.
+
+    One pooled session is shared across workers (the adapter holds enough
+    connections for all of them); pacing is per host, so a mixed URL list
+    crawls every domain in parallel and only same-host requests wait.
+    """
+    session = create_session()
+
+    def one(i, url):
+        try:
+            html_bytes = _html_cache_get(url)
+            if html_bytes is None:
+                wait = _reserve_host_slot(url)
+                if wait > 0:
+                    time.sleep(wait)
+                print(f"[{i}/{len(urls)}] Fetching: {url}")
+                html_bytes = fetch_url(session, url).content
+                _html_cache_put(url, html_bytes)
+            else:
+                print(f"[{i}/{len(urls)}] Cached: {url}")
+            return i, url, process_page(i, url, html_bytes)
+        except Exception as e:
+            return i, url, e
+
+    with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as pool:
+        results = list(pool.map(lambda args: one(*args), enumerate(urls, start=1)))
+    return results
+
+def main():
+    urls = list(load_urls(URLS_FILE))
+    if DEBUG:
+        DEBUG_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    ENABLE_SHEETS_FLAG = False
+    client = None
+    ws = None
+    if ENABLE_SHEETS:
+        try:
+            client = get_gsheet_client()
+            sh, ws = ensure_sheet_and_header(client)
+            ENABLE_SHEETS_FLAG = True
+        except Exception as e:
+            print(f"[WARN] Google Sheets disabled due to: {e}")
+            ENABLE_SHEETS_FLAG = False
+
+    if ENABLE_SHEETS_FLAG:
+        # Fetching dominates the run, so anything whose URL already sits in
+        # column A was handled by a previous run and is free to skip.
+        try:
+            existing = set(ws.col_values(1)[1:])
+        except Exception as e:
+            print(f"[WARN] Could not read existing URLs from sheet: {e}")
+            existing = set()
+        if existing:
+            before = len(urls)
+            urls = [u for u in urls if u not in existing]
+            if len(urls) != before:
+                print(f"Skipping {before - len(urls)} URLs already in the sheet.")
+
+    sheets_q = sheets_thread = None
+    if ENABLE_SHEETS_FLAG:
+        sheets_q, sheets_thread = start_sheets_writer(ws)
+
+    if aiohttp is not None:
+        results = asyncio.run(crawl_async(urls))
+    else:
+        results = crawl_threaded(urls)
+
+    batch = []
+    for i, url, row in results:
+        if isinstance(row, Exception):
+            print(f"Error processing {url}: {row}")
+            continue
+        batch.append(row)
+
+        # Hand full batches to the background writer — one append_rows
+        # round-trip each, off the critical path
+        if ENABLE_SHEETS_FLAG and len(batch) >= SHEETS_FLUSH_ROWS:
+            sheets_q.put(batch)
+            batch = []
+
+    if ENABLE_SHEETS_FLAG:
+        if batch:
+            sheets_q.put(batch)
+        sheets_q.put(None)
+        sheets_thread.join()
+
+    print("Done.")
+
+if __name__ == "__main__":
+    print("Starting Coursera scrape (XPath-first) with debug HTML v3…")
+    main()
+